@@ -10,6 +10,22 @@ class Config:
 
     # MongoDB config
     MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/your_database'
+    MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'vehicleapi')
+    MONGO_APP_NAME = os.environ.get('MONGO_APP_NAME', 'vehicle-api')
+    # Per-process connection pool; each gunicorn worker gets its own client
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 300000))
+    # How long a request waits for a free pooled connection before failing
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 30000))
+    # Wire compression, in preference order (zstd/snappy need their python packages)
+    MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zlib')
+    # Command timing per endpoint: slow-command log threshold and samples kept per series
+    DB_SLOW_COMMAND_MS = float(os.environ.get('DB_SLOW_COMMAND_MS', 100))
+    DB_TIMING_SAMPLES = int(os.environ.get('DB_TIMING_SAMPLES', 1024))
 
     # JWT config
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'your-jwt-secret-key'
@@ -22,9 +38,87 @@ class Config:
     # CORS settings
     CORS_HEADERS = 'Content-Type'
 
+    # Create missing MongoDB indexes (src/config/schema.py) when the app starts
+    ENSURE_INDEXES_ON_STARTUP = os.environ.get('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+
+    # Per-request phase timings: Server-Timing response header and JSON access log
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+    ACCESS_LOG_ENABLED = os.environ.get('ACCESS_LOG_ENABLED', 'true').lower() == 'true'
+
+    # Profiling: per-request cProfile for admins and a continuous stack sampler
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 200))
+    PROFILER_CONTINUOUS = os.environ.get('PROFILER_CONTINUOUS', 'false').lower() == 'true'
+    PROFILER_SAMPLE_HZ = float(os.environ.get('PROFILER_SAMPLE_HZ', 50))
+    PROFILER_FLUSH_INTERVAL = float(os.environ.get('PROFILER_FLUSH_INTERVAL', 60))
+
+    # Vehicle lookup engine
+    LOOKUP_MAX_WORKERS = int(os.environ.get('LOOKUP_MAX_WORKERS', 16))
+    LOOKUP_LEG_TIMEOUT = float(os.environ.get('LOOKUP_LEG_TIMEOUT', 30))
+    LOOKUP_BATCH_WORKERS = int(os.environ.get('LOOKUP_BATCH_WORKERS', 32))
+    BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 500))
+    BATCH_MAX_PARALLEL = int(os.environ.get('BATCH_MAX_PARALLEL', 8))
+
+    # API rate limiting: 'local' keeps token buckets in process memory and
+    # writes usage behind to Mongo (limits are per worker); 'mongo' validates
+    # and charges each request with one atomic find_one_and_update, exact
+    # across workers
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'local')
+    RATE_LIMIT_FLUSH_INTERVAL = float(os.environ.get('RATE_LIMIT_FLUSH_INTERVAL', 0.25))
+    RATE_LIMIT_RESYNC_INTERVAL = float(os.environ.get('RATE_LIMIT_RESYNC_INTERVAL', 5))
+
+    # API key metadata cache (seconds)
+    API_KEY_CACHE_TTL = float(os.environ.get('API_KEY_CACHE_TTL', 30))
+    API_KEY_CACHE_SIZE = int(os.environ.get('API_KEY_CACHE_SIZE', 10000))
+    API_KEY_CACHE_VERSION_INTERVAL = float(os.environ.get('API_KEY_CACHE_VERSION_INTERVAL', 2))
+
+    # JWT auth context cache (seconds)
+    AUTH_CONTEXT_CACHE_TTL = float(os.environ.get('AUTH_CONTEXT_CACHE_TTL', 60))
+    AUTH_CONTEXT_CACHE_SIZE = int(os.environ.get('AUTH_CONTEXT_CACHE_SIZE', 10000))
+    TOKEN_REVOCATION_REFRESH_INTERVAL = float(os.environ.get('TOKEN_REVOCATION_REFRESH_INTERVAL', 10))
+
+    # Password hashing process pool; changing the method rehashes on next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+
+    # Asynchronous lookup jobs; 0 web-process workers means a separate
+    # `python -m src.workers.lookup_worker` process handles the queue
+    LOOKUP_JOB_WORKERS = int(os.environ.get('LOOKUP_JOB_WORKERS', 0))
+    LOOKUP_JOB_LEASE_SECONDS = int(os.environ.get('LOOKUP_JOB_LEASE_SECONDS', 60))
+    LOOKUP_JOB_RESULT_TTL = int(os.environ.get('LOOKUP_JOB_RESULT_TTL', 86400))
+    LOOKUP_JOB_MAX_ATTEMPTS = int(os.environ.get('LOOKUP_JOB_MAX_ATTEMPTS', 3))
+
+    # Vehicle lookup cache (seconds)
+    VEHICLE_CACHE_MAX_SIZE = int(os.environ.get('VEHICLE_CACHE_MAX_SIZE', 10000))
+    VEHICLE_CACHE_TTL = int(os.environ.get('VEHICLE_CACHE_TTL', 3600))
+    VEHICLE_CACHE_STALE_TTL = int(os.environ.get('VEHICLE_CACHE_STALE_TTL', 86400))
+
+    # Upstream HTTP client (carinfo, acko); timeouts in seconds
+    UPSTREAM_POOL_SIZE = int(os.environ.get('UPSTREAM_POOL_SIZE', 32))
+    UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 3.05))
+    UPSTREAM_READ_TIMEOUT = float(os.environ.get('UPSTREAM_READ_TIMEOUT', 10))
+
+    # Upstream resilience: circuit breaker, retry budget, hedged requests
+    UPSTREAM_MAX_RETRIES = int(os.environ.get('UPSTREAM_MAX_RETRIES', 2))
+    UPSTREAM_RETRY_BUDGET_RATIO = float(os.environ.get('UPSTREAM_RETRY_BUDGET_RATIO', 0.2))
+    UPSTREAM_BREAKER_FAILURE_RATE = float(os.environ.get('UPSTREAM_BREAKER_FAILURE_RATE', 0.5))
+    UPSTREAM_BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('UPSTREAM_BREAKER_SLOW_CALL_SECONDS', 5))
+    UPSTREAM_BREAKER_OPEN_SECONDS = float(os.environ.get('UPSTREAM_BREAKER_OPEN_SECONDS', 30))
+    UPSTREAM_HEDGE = os.environ.get('UPSTREAM_HEDGE', 'false').lower() == 'true'
+    UPSTREAM_HEDGE_WORKERS = int(os.environ.get('UPSTREAM_HEDGE_WORKERS', 16))
+
+    # Acko ekey store (seconds)
+    EKEY_TTL = int(os.environ.get('EKEY_TTL', 7 * 86400))
+
+    # carinfo build id (url_key) in-memory TTL (seconds)
+    URL_KEY_TTL = int(os.environ.get('URL_KEY_TTL', 300))
+    # Minimum gap between build id discoveries from the carinfo home page (seconds)
+    URL_KEY_DISCOVERY_INTERVAL = int(os.environ.get('URL_KEY_DISCOVERY_INTERVAL', 60))
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    LOOKUP_JOB_WORKERS = int(os.environ.get('LOOKUP_JOB_WORKERS', 2))
     SECRET_KEY = os.environ.get('SECRET_KEY')
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
     MONGO_URI = os.environ.get('MONGO_URI')
@@ -33,6 +127,8 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 5))
     SECRET_KEY = os.environ.get('SECRET_KEY')
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
     MONGO_URI = os.environ.get('MONGO_URI')
@@ -1,16 +1,33 @@
 # main.py
 from flask import Flask, jsonify , Blueprint, send_from_directory
-from src.routes import auth_routes, user_routes, vehicle_routes , api_key_routes
+from src.routes import auth_routes, user_routes, vehicle_routes , api_key_routes, ops_routes, metrics_routes
 from src.config.database import get_db
+from src.config.schema import ensure_indexes
+from src.utils.db_monitor import CommandTimer
+from src.utils import metrics
+from src.utils.request_timing import RequestTimingReporter
+from src.utils.profiler import RequestProfiler, SamplingProfiler
 from src.services.auth_service import AuthService
 from src.services.user_service import UserService
 from src.services.api_key_service import APIKeyService
+from src.services.auth_context_cache import AuthContextCache
+from src.services.token_revocation import RevocationFilter
+from src.services.password_hasher import PasswordHasher
+from src.services.rate_limiter import LocalRateLimiter
+from src.services.lookup_engine import LookupEngine
+from src.services.upstream_client import UpstreamClient
+from src.services.resilience import build_provider_guards
+from src.services.ekey_store import EkeyStore
+from src.services.lookup_job_service import LookupJobService
+from src.workers.lookup_worker import LookupWorkerPool
+from src.services.vehicle_cache import VehicleCache
+from src.utils.single_flight import SingleFlight
 import os
 from flask_cors import CORS
 from config import config_by_name
 
 
-def create_app(config_name='dev'):
+def create_app(config_name='dev', start_job_workers=True):
     app = Flask(__name__,  static_folder='dist')
 
     # Load configuration
@@ -19,13 +36,111 @@ def create_app(config_name='dev'):
     # Initialize CORS
     CORS(app)
 
+    # Request metrics, exposed at /metrics
+    metrics.init_app(app)
+
+    # Per-phase timings as a Server-Timing header and JSON access log
+    RequestTimingReporter(
+        server_timing=app.config['SERVER_TIMING_ENABLED'],
+        access_log=app.config['ACCESS_LOG_ENABLED']
+    ).init_app(app)
+
+    # On-demand profiling for admins (see ops routes)
+    app.request_profiler = RequestProfiler(
+        directory=app.config['PROFILE_DIR'],
+        max_files=app.config['PROFILE_MAX_FILES']
+    )
+    app.request_profiler.init_app(app)
+    app.sampling_profiler = SamplingProfiler(
+        directory=app.config['PROFILE_DIR'],
+        hz=app.config['PROFILER_SAMPLE_HZ'],
+        flush_interval=app.config['PROFILER_FLUSH_INTERVAL'],
+        max_files=app.config['PROFILE_MAX_FILES'],
+        autostart=app.config['PROFILER_CONTINUOUS']
+    )
+    app.sampling_profiler.init_app(app)
+
     # Initialize database
-    app.db = get_db()
+    app.db_timer = CommandTimer(
+        slow_ms=app.config['DB_SLOW_COMMAND_MS'],
+        samples=app.config['DB_TIMING_SAMPLES']
+    )
+    app.db_timer.init_app(app)
+    app.db = get_db(app.config, listeners=[app.db_timer])
+    if app.config['ENSURE_INDEXES_ON_STARTUP']:
+        try:
+            ensure_indexes(app.db)
+        except Exception as e:
+            app.logger.error(f"Error ensuring indexes: {str(e)}")
 
     # Initialize services
-    app.auth_service = AuthService(app.db)
-    app.user_service = UserService(app.db)
-    app.api_key_service = APIKeyService(app.db)
+    app.auth_context_cache = AuthContextCache(
+        app.db.users,
+        ttl=app.config['AUTH_CONTEXT_CACHE_TTL'],
+        max_size=app.config['AUTH_CONTEXT_CACHE_SIZE']
+    )
+    app.password_hasher = PasswordHasher(
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        method=app.config['PASSWORD_HASH_METHOD']
+    )
+    app.auth_service = AuthService(
+        app.db,
+        app.password_hasher,
+        auth_context_cache=app.auth_context_cache
+    )
+    app.revocation_filter = RevocationFilter(
+        app.db.users,
+        refresh_interval=app.config['TOKEN_REVOCATION_REFRESH_INTERVAL'],
+        token_lifetime=app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds()
+    )
+    app.user_service = UserService(
+        app.db,
+        app.password_hasher,
+        auth_context_cache=app.auth_context_cache,
+        revocation_filter=app.revocation_filter
+    )
+    app.api_key_service = APIKeyService(
+        app.db,
+        url_key_ttl=app.config['URL_KEY_TTL'],
+        url_key_discovery_interval=app.config['URL_KEY_DISCOVERY_INTERVAL'],
+        key_cache_ttl=app.config['API_KEY_CACHE_TTL'],
+        key_cache_size=app.config['API_KEY_CACHE_SIZE'],
+        key_cache_version_interval=app.config['API_KEY_CACHE_VERSION_INTERVAL']
+    )
+    app.rate_limiter = None
+    if app.config['RATE_LIMIT_BACKEND'] == 'local':
+        app.rate_limiter = LocalRateLimiter(
+            app.db.api_keys,
+            flush_interval=app.config['RATE_LIMIT_FLUSH_INTERVAL'],
+            resync_interval=app.config['RATE_LIMIT_RESYNC_INTERVAL']
+        )
+    app.upstream_client = UpstreamClient(
+        pool_maxsize=app.config['UPSTREAM_POOL_SIZE'],
+        connect_timeout=app.config['UPSTREAM_CONNECT_TIMEOUT'],
+        read_timeout=app.config['UPSTREAM_READ_TIMEOUT'],
+        guards=build_provider_guards(app.config)
+    )
+    app.ekey_store = EkeyStore(app.db, ttl=app.config['EKEY_TTL'])
+    app.lookup_engine = LookupEngine(
+        max_workers=app.config['LOOKUP_MAX_WORKERS'],
+        leg_timeout=app.config['LOOKUP_LEG_TIMEOUT'],
+        batch_workers=app.config['LOOKUP_BATCH_WORKERS']
+    )
+    app.vehicle_cache = VehicleCache(
+        app.db,
+        max_size=app.config['VEHICLE_CACHE_MAX_SIZE'],
+        ttl=app.config['VEHICLE_CACHE_TTL'],
+        stale_ttl=app.config['VEHICLE_CACHE_STALE_TTL']
+    )
+    app.lookup_flight = SingleFlight()
+    app.lookup_job_service = LookupJobService(
+        app.db,
+        lease_seconds=app.config['LOOKUP_JOB_LEASE_SECONDS'],
+        result_ttl=app.config['LOOKUP_JOB_RESULT_TTL'],
+        max_attempts=app.config['LOOKUP_JOB_MAX_ATTEMPTS']
+    )
+    if start_job_workers and app.config['LOOKUP_JOB_WORKERS'] > 0:
+        app.lookup_workers = LookupWorkerPool(app, workers=app.config['LOOKUP_JOB_WORKERS']).start()
 
     # app.register_blueprint(auth_routes.bp, url_prefix='/auth')
     # app.register_blueprint(user_routes.bp, url_prefix='/users')
@@ -39,9 +154,11 @@ def create_app(config_name='dev'):
     api_v1.register_blueprint(user_routes.bp, url_prefix='/users')
     api_v1.register_blueprint(vehicle_routes.bp, url_prefix='/vehicles')
     api_v1.register_blueprint(api_key_routes.bp, url_prefix='/keys')
+    api_v1.register_blueprint(ops_routes.bp, url_prefix='/ops')
 
     # Register api_v1 blueprint
     app.register_blueprint(api_v1)
+    app.register_blueprint(metrics_routes.bp)
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve(path):
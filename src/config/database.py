@@ -1,10 +1,232 @@
+# src/config/database.py
+"""One MongoClient per process, created on first use.
+
+get_db() returns a lightweight handle whose collections resolve to the
+current process's client on every access. Services can keep `db.users`
+around from create_app; after gunicorn forks, each worker transparently
+builds its own client (and pool) instead of sharing the parent's sockets.
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Any, Mapping, Optional, Sequence
+from pymongo import monitoring
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
-from load_dotenv import load_dotenv
-import os
+from dotenv import load_dotenv
+
 load_dotenv()
-uri = os.getenv("MONGO_URI")
-def get_db():
-    client = MongoClient(uri, server_api=ServerApi('1'))
-    db = client.vehicleapi
-    return db
+logger = logging.getLogger(__name__)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """CMAP listener keeping per-server connection pool counters"""
+
+    def __init__(self):
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # A forked worker starts with its own, empty pool
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._servers: Dict[str, Dict[str, Any]] = defaultdict(self._empty)
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        return {
+            'open': 0, 'in_use': 0, 'created': 0, 'closed': 0,
+            'checkouts': 0, 'checkout_failures': defaultdict(int),
+            'wait_ms_total': 0.0, 'wait_ms_max': 0.0, 'pool_clears': 0
+        }
+
+    def _update(self, address, **changes):
+        with self._lock:
+            server = self._servers[f'{address[0]}:{address[1]}']
+            for key, delta in changes.items():
+                server[key] += delta
+
+    def _waited_ms(self) -> float:
+        started = getattr(self._local, 'checkout_started', None)
+        self._local.checkout_started = None
+        return (time.perf_counter() - started) * 1000 if started else 0.0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._update(event.address, pool_clears=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._update(event.address, open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1, closed=1)
+
+    def connection_check_out_started(self, event):
+        # Checkout happens on the requesting thread, so time the wait per thread
+        self._local.checkout_started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        waited = self._waited_ms()
+        with self._lock:
+            self._servers[f'{event.address[0]}:{event.address[1]}']['checkout_failures'][event.reason] += 1
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+            logger.warning(f"MongoDB pool exhausted for {event.address[0]}: checkout timed out after {waited:.0f} ms")
+
+    def connection_checked_out(self, event):
+        waited = self._waited_ms()
+        with self._lock:
+            server = self._servers[f'{event.address[0]}:{event.address[1]}']
+            server['in_use'] += 1
+            server['checkouts'] += 1
+            server['wait_ms_total'] += waited
+            server['wait_ms_max'] = max(server['wait_ms_max'], waited)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, in_use=-1)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for address, server in self._servers.items():
+                entry = dict(server, checkout_failures=dict(server['checkout_failures']))
+                entry['wait_ms_avg'] = round(server['wait_ms_total'] / server['checkouts'], 3) if server['checkouts'] else 0.0
+                result[address] = entry
+            return result
+
+
+def _load_settings(config) -> Mapping[str, Any]:
+    if config is None:
+        from config import config_by_name
+        config = config_by_name[os.getenv('FLASK_ENV', 'dev')]
+    if isinstance(config, Mapping):
+        return config
+    return {name: getattr(config, name) for name in dir(config) if name.isupper()}
+
+
+class _ProcessClient:
+    """Holds the client for the current process, rebuilding it after a fork"""
+
+    def __init__(self, settings: Mapping[str, Any], listeners: Sequence[Any] = ()):
+        self.settings = settings
+        self.pool_listener = PoolStatsListener()
+        self.listeners = list(listeners)
+        self._client: Optional[MongoClient] = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _build(self) -> MongoClient:
+        settings = self.settings
+        options = {
+            'server_api': ServerApi('1'),
+            'maxPoolSize': settings['MONGO_MAX_POOL_SIZE'],
+            'minPoolSize': settings['MONGO_MIN_POOL_SIZE'],
+            'maxIdleTimeMS': settings['MONGO_MAX_IDLE_TIME_MS'],
+            'waitQueueTimeoutMS': settings['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+            'serverSelectionTimeoutMS': settings['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+            'connectTimeoutMS': settings['MONGO_CONNECT_TIMEOUT_MS'],
+            'socketTimeoutMS': settings['MONGO_SOCKET_TIMEOUT_MS'],
+            'appname': settings['MONGO_APP_NAME'],
+            'event_listeners': [self.pool_listener] + self.listeners,
+            # Do not block startup on connecting; the first operation connects
+            'connect': False
+        }
+        if settings['MONGO_COMPRESSORS']:
+            options['compressors'] = settings['MONGO_COMPRESSORS']
+        return MongoClient(settings['MONGO_URI'], **options)
+
+    def get(self) -> MongoClient:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # The parent's client (if any) is not closed here: its sockets
+                    # belong to the parent, and closing them would affect it
+                    self._client = self._build()
+                    self._pid = os.getpid()
+        return self._client
+
+    def close(self):
+        if self._client is not None and self._pid == os.getpid():
+            self._client.close()
+            self._client = None
+            self._pid = None
+
+
+class LazyCollection:
+    """Stands in for a pymongo Collection bound to the current process's client"""
+
+    def __init__(self, database: 'LazyDatabase', name: str):
+        self._database = database
+        self._name = name
+        self._collection = None
+        self._client = None
+
+    def _resolve(self):
+        client = self._database.process_client.get()
+        if self._client is not client:
+            self._collection = client[self._database.name][self._name]
+            self._client = client
+        return self._collection
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __repr__(self):
+        return f'LazyCollection({self._database.name}.{self._name})'
+
+
+class LazyDatabase:
+    """Stands in for a pymongo Database; `db.users` and `db['users']` give LazyCollections"""
+
+    def __init__(self, process_client: _ProcessClient, name: str):
+        self.process_client = process_client
+        self.name = name
+        self._collections: Dict[str, LazyCollection] = {}
+
+    def __getitem__(self, name: str) -> LazyCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections.setdefault(name, LazyCollection(self, name))
+        return collection
+
+    def __getattr__(self, name: str) -> LazyCollection:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    @property
+    def client(self) -> MongoClient:
+        return self.process_client.get()
+
+    def command(self, *args, **kwargs):
+        return self.client[self.name].command(*args, **kwargs)
+
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.process_client.pool_listener.stats()
+
+    def close(self):
+        self.process_client.close()
+
+
+def get_db(config=None, listeners: Sequence[Any] = ()) -> LazyDatabase:
+    """Database handle configured from a Flask config mapping or a config class
+    (defaults to the FLASK_ENV profile). No connection is opened until first use;
+    `listeners` are extra pymongo event listeners for the client."""
+    settings = _load_settings(config)
+    return LazyDatabase(_ProcessClient(settings, listeners), settings['MONGO_DB_NAME'])
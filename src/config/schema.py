@@ -0,0 +1,165 @@
+# src/config/schema.py
+"""Indexes every collection needs, in one place.
+
+ensure_indexes() creates whatever is missing (run at startup and by the CLI);
+check_indexes() reports missing, conflicting, undeclared and unused indexes,
+the latter from $indexStats.
+
+    python -m src.config.schema ensure
+    python -m src.config.schema check
+"""
+import argparse
+import json
+import logging
+from typing import Dict, Any, List, Tuple
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+logger = logging.getLogger(__name__)
+
+# collection -> [(keys, options)]; every index is named so drift is easy to spot
+INDEXES: Dict[str, List[Tuple[List[Tuple[str, int]], Dict[str, Any]]]] = {
+    'users': [
+        ([('email', ASCENDING)], {'name': 'email_1', 'unique': True}),
+        ([('username', ASCENDING)], {'name': 'username_1', 'unique': True}),
+        # Admin user list, keyset-paginated newest first
+        ([('created_at', DESCENDING), ('_id', DESCENDING)], {'name': 'created_at_-1__id_-1'}),
+        # Token revocation filter: users whose tokens were revoked recently
+        ([('tokens_revoked_at', ASCENDING)], {
+            'name': 'tokens_revoked_at_1',
+            'partialFilterExpression': {'tokens_revoked_at': {'$exists': True}}
+        }),
+    ],
+    'api_keys': [
+        ([('api_key', ASCENDING)], {'name': 'api_key_1', 'unique': True}),
+        ([('user_id', ASCENDING), ('is_active', ASCENDING)], {'name': 'user_id_1_is_active_1'}),
+        # Per-user key listing, keyset-paginated newest first
+        ([('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+         {'name': 'user_id_1_created_at_-1__id_-1'}),
+    ],
+    'url_key': [
+        ([('url_data', ASCENDING)], {'name': 'url_data_1'}),
+    ],
+    'vehicle_cache': [
+        ([('expires_at', ASCENDING)], {'name': 'expires_at_1', 'expireAfterSeconds': 0}),
+    ],
+    'acko_ekeys': [
+        ([('expires_at', ASCENDING)], {'name': 'expires_at_1', 'expireAfterSeconds': 0}),
+    ],
+    'lookup_jobs': [
+        ([('status', ASCENDING), ('lease_until', ASCENDING), ('created_at', ASCENDING)],
+         {'name': 'status_1_lease_until_1_created_at_1'}),
+        ([('expires_at', ASCENDING)], {'name': 'expires_at_1', 'expireAfterSeconds': 0}),
+    ],
+}
+
+# Index options that must match for an existing index to count as the declared one
+_COMPARED_OPTIONS = ('unique', 'expireAfterSeconds', 'partialFilterExpression', 'sparse')
+
+
+def _existing_by_keys(collection) -> Dict[Tuple, Dict[str, Any]]:
+    existing = {}
+    for name, info in collection.index_information().items():
+        existing[tuple((field, int(direction)) for field, direction in info['key'])] = dict(info, name=name)
+    return existing
+
+
+def _conflicts(options: Dict[str, Any], info: Dict[str, Any]) -> List[str]:
+    conflicts = []
+    for option in _COMPARED_OPTIONS:
+        declared, actual = options.get(option), info.get(option)
+        if option in ('unique', 'sparse'):
+            declared, actual = bool(declared), bool(actual)
+        if declared != actual:
+            conflicts.append(option)
+    return conflicts
+
+
+def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Create declared indexes that do not exist yet; returns created index names per collection.
+
+    Existing indexes whose options differ are left alone and logged; fix those with
+    a migration rather than at startup.
+    """
+    created = {}
+    for collection_name, specs in INDEXES.items():
+        collection = db[collection_name]
+        existing = _existing_by_keys(collection)
+        missing = []
+        for keys, options in specs:
+            info = existing.get(tuple(keys))
+            if info is None:
+                missing.append(IndexModel(keys, **options))
+                continue
+            conflicts = _conflicts(options, info)
+            if conflicts:
+                logger.warning(
+                    f"Index {collection_name}.{info['name']} differs from the schema in {', '.join(conflicts)}"
+                )
+        for model in missing:
+            # One at a time, so e.g. duplicate data blocking a unique index does not block the rest
+            try:
+                created.setdefault(collection_name, []).extend(collection.create_indexes([model]))
+            except Exception as e:
+                logger.error(f"Error creating index {collection_name}.{model.document['name']}: {str(e)}")
+        if created.get(collection_name):
+            logger.info(f"Created indexes on {collection_name}: {', '.join(created[collection_name])}")
+    return created
+
+
+def check_indexes(db) -> Dict[str, Dict[str, Any]]:
+    """Compare live indexes with the schema and report usage since the last server restart"""
+    report = {}
+    for collection_name, specs in INDEXES.items():
+        collection = db[collection_name]
+        existing = _existing_by_keys(collection)
+        declared = {tuple(keys) for keys, _ in specs}
+
+        missing, conflicting = [], []
+        for keys, options in specs:
+            info = existing.get(tuple(keys))
+            if info is None:
+                missing.append(options['name'])
+            elif _conflicts(options, info):
+                conflicting.append(info['name'])
+
+        undeclared = [
+            info['name'] for keys, info in existing.items()
+            if keys not in declared and info['name'] != '_id_'
+        ]
+
+        usage, unused = {}, []
+        try:
+            for stats in collection.aggregate([{'$indexStats': {}}]):
+                ops = stats['accesses']['ops']
+                usage[stats['name']] = ops
+                if ops == 0 and stats['name'] != '_id_':
+                    unused.append(stats['name'])
+        except Exception as e:
+            logger.warning(f"Could not read $indexStats for {collection_name}: {str(e)}")
+
+        report[collection_name] = {
+            'missing': missing,
+            'conflicting': conflicting,
+            'undeclared': undeclared,
+            'unused': sorted(unused),
+            'usage': usage
+        }
+    return report
+
+
+if __name__ == '__main__':
+    from src.config.database import get_db
+
+    parser = argparse.ArgumentParser(description='Create or check the MongoDB indexes the app relies on')
+    parser.add_argument('command', choices=['ensure', 'check'])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = get_db()
+    if args.command == 'ensure':
+        print(json.dumps(ensure_indexes(db), indent=2))
+    else:
+        report = check_indexes(db)
+        print(json.dumps(report, indent=2))
+        if any(entry['missing'] or entry['conflicting'] for entry in report.values()):
+            raise SystemExit(1)
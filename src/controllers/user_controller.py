@@ -1,8 +1,7 @@
 # src/controllers/user_controller.py
 from flask import jsonify, current_app
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional
 import logging
-import math
 from bson import ObjectId
 
 
@@ -214,42 +213,78 @@ class UserController:
                 'message': 'Failed to create user'
             }), 500
 
+    @classmethod
+    def set_user_status(cls, user_id: str, data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """Activate or deactivate a user"""
+        try:
+            if not data or not isinstance(data.get('is_active'), bool):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'is_active (boolean) is required'
+                }), 400
+
+            if not ObjectId.is_valid(user_id):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Invalid user id'
+                }), 400
+
+            user_service = current_app.user_service
+            success, error = user_service.set_active(user_id, data['is_active'])
+
+            if not success:
+                return jsonify({
+                    'status': 'error',
+                    'message': error or 'Failed to update user status'
+                }), 404 if error == "User not found" else 400
+
+            return jsonify({
+                'status': 'success',
+                'message': 'User activated' if data['is_active'] else 'User deactivated'
+            }), 200
+
+        except Exception as e:
+            logging.error(f"Error in set_user_status: {str(e)}")
+            return jsonify({
+                'status': 'error',
+                'message': 'Failed to update user status'
+            }), 500
+
     # Fix list_users to match class method pattern
     @classmethod
-    def list_users(cls, page: int, limit: int) -> Tuple[Dict[str, Any], int]:
+    def list_users(cls, limit: int, cursor: Optional[str] = None, exact_count: bool = False) -> Tuple[Dict[str, Any], int]:
         """
-        List users with pagination
+        List users with cursor pagination
 
         Args:
-            page: Page number (starts from 1)
             limit: Number of items per page
+            cursor: Opaque `next_cursor` from the previous page
+            exact_count: Count all users instead of using the estimated total
         """
         try:
-            # Validate pagination parameters
-            page = max(1, page)  # Ensure page is at least 1
             limit = max(1, min(limit, 100))  # Limit between 1 and 100
 
             user_service = current_app.user_service
-            users, total_count = user_service.get_all_users_paginated(page, limit)
-
-            # Calculate pagination metadata
-            total_pages = math.ceil(total_count / limit)
-            has_next = page < total_pages
-            has_prev = page > 1
+            try:
+                users, next_cursor, total_count = user_service.get_all_users_paginated(
+                    limit, cursor, exact_count
+                )
+            except ValueError:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Invalid cursor'
+                }), 400
 
             return jsonify({
                 'status': 'success',
                 'data': {
                     'users': users,
                     'pagination': {
-                        'page': page,
                         'limit': limit,
                         'total_items': total_count,
-                        'total_pages': total_pages,
-                        'has_next': has_next,
-                        'has_prev': has_prev,
-                        'next_page': page + 1 if has_next else None,
-                        'prev_page': page - 1 if has_prev else None
+                        'total_is_estimate': not exact_count,
+                        'has_next': next_cursor is not None,
+                        'next_cursor': next_cursor
                     }
                 }
             }), 200
@@ -14,10 +14,10 @@ class VehicleController:
     #     except Exception as e:
     #         return jsonify({"error": str(e)}), 500
 
-    def get_vehicle_details(self, vehNum):
+    def get_vehicle_details(self, vehNum, fields=None):
         try:
             number = vehNum.upper()
-            response_data = get_vehicle_details_from_number(number)
+            response_data = get_vehicle_details_from_number(number, fields)
             if response_data is None:
                 return {"error": "Vehicle not found"}, 404
             return response_data
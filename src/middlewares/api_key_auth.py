@@ -1,9 +1,11 @@
 # src/middlewares/api_key_auth.py
 from functools import wraps
 from flask import request, jsonify, current_app
+from src.utils.request_timing import request_phase
 
 
 def require_api_key(f):
+    """Validate the X-API-Key header without charging usage; the route charges its own quota"""
     @wraps(f)
     def decorated(*args, **kwargs):
         api_key = request.headers.get('X-API-Key')
@@ -14,7 +16,10 @@ def require_api_key(f):
                 'message': 'API key is required'
             }), 401
 
-        is_valid, key_data, error = current_app.api_key_service.validate_api_key(api_key)
+        with request_phase('api_key_auth'):
+            is_valid, key_data, error = current_app.api_key_service.validate_api_key(
+                api_key, charge_usage=False, cached=True
+            )
 
         if not is_valid:
             return jsonify({
@@ -3,7 +3,7 @@ from functools import wraps
 from flask import request, jsonify, current_app
 import jwt
 from typing import Callable
-from bson import ObjectId
+from src.utils.request_timing import request_phase
 
 
 def token_required(f: Callable) -> Callable:
@@ -28,20 +28,47 @@ def token_required(f: Callable) -> Callable:
             if not token:
                 return jsonify({'error': 'Token is missing'}), 401
 
-            # Verify token
-            try:
-                payload = jwt.decode(
-                    token,
-                    current_app.config['SECRET_KEY'],
-                    algorithms=['HS256']
-                )
-            except jwt.ExpiredSignatureError:
-                return jsonify({'error': 'Token has expired'}), 401
-            except jwt.InvalidTokenError:
-                return jsonify({'error': 'Invalid token'}), 401
-
-            # Get user from database
-            current_user = current_app.db.users.find_one({'_id': ObjectId(payload['user_id'])})
+            auth_cache = current_app.auth_context_cache
+
+            # Verify token (verified payloads are cached until they expire)
+            with request_phase('auth'):
+                payload = auth_cache.get_payload(token)
+                if payload is None:
+                    try:
+                        payload = jwt.decode(
+                            token,
+                            current_app.config['SECRET_KEY'],
+                            algorithms=['HS256']
+                        )
+                    except jwt.ExpiredSignatureError:
+                        return jsonify({'error': 'Token has expired'}), 401
+                    except jwt.InvalidTokenError:
+                        return jsonify({'error': 'Invalid token'}), 401
+                    auth_cache.put_payload(token, payload)
+
+            # Tokens carrying role/active claims authorize without touching the DB,
+            # unless the user shows up in the revocation filter
+            revocation_filter = current_app.revocation_filter
+            with request_phase('auth'):
+                revocations_loaded = revocation_filter.ensure_loaded()
+            if 'role' in payload and 'is_active' in payload and revocations_loaded:
+                if revocation_filter.is_revoked(payload):
+                    return jsonify({'error': 'Token has been revoked'}), 401
+                if not payload['is_active']:
+                    return jsonify({'error': 'User account is inactive'}), 401
+
+                current_user = {
+                    '_id': payload['user_id'],
+                    'username': payload.get('username'),
+                    'full_name': payload.get('full_name'),
+                    'role': payload['role'],
+                    'is_active': payload['is_active']
+                }
+                return f(current_user, *args, **kwargs)
+
+            # Get the user's auth context (cached, projected to the fields middleware needs)
+            with request_phase('auth'):
+                current_user = auth_cache.get_user(payload['user_id'])
             if not current_user:
                 return jsonify({'error': 'User not found'}), 401
 
@@ -49,9 +76,6 @@ def token_required(f: Callable) -> Callable:
             if not current_user.get('is_active', True):
                 return jsonify({'error': 'User account is inactive'}), 401
 
-            # Convert ObjectId to string
-            current_user['_id'] = str(current_user['_id'])
-
             # Call the original function with current_user
             return f(current_user, *args, **kwargs)
 
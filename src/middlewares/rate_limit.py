@@ -2,6 +2,9 @@
 
 from functools import wraps
 from flask import request, jsonify, current_app
+from pymongo.errors import PyMongoError
+from src.utils.request_timing import request_phase
+from src.utils.metrics import RATE_LIMIT_REJECTIONS
 
 def check_rate_limit(f):
     @wraps(f)
@@ -18,19 +21,43 @@ def check_rate_limit(f):
                     'message': 'API key is required'
                 }), 401
 
-            # Validate and get key data
-            is_valid, key_data, error = current_app.api_key_service.validate_api_key(api_key)
+            rate_limiter = current_app.rate_limiter
+            if rate_limiter is not None:
+                # In-process limiter accounts usage itself and writes it behind
+                with request_phase('api_key_auth'):
+                    is_valid, key_data, error = current_app.api_key_service.validate_api_key(
+                        api_key, charge_usage=False, cached=True
+                    )
+                if not is_valid or not key_data:
+                    return jsonify({
+                        'status': 'error',
+                        'message': error or 'Invalid API key'
+                    }), 401
 
-            if not is_valid or not key_data:
-                return jsonify({
-                    'status': 'error',
-                    'message': error or 'Invalid API key'
-                }), 401
+                with request_phase('rate_limit'):
+                    is_allowed, error = rate_limiter.acquire(key_data)
+            else:
+                # Validate and charge in one atomic round trip
+                try:
+                    with request_phase('rate_limit'):
+                        key_data, error, is_rate_limited = current_app.api_key_service.consume_request(api_key)
+                except PyMongoError as e:
+                    # An unreachable store is an outage, not a bad key
+                    current_app.logger.error(f"Rate limit store unavailable: {str(e)}")
+                    return jsonify({
+                        'status': 'error',
+                        'message': 'Rate limit service temporarily unavailable'
+                    }), 503
+                if not key_data:
+                    return jsonify({
+                        'status': 'error',
+                        'message': error or 'Invalid API key'
+                    }), 401
 
-            # Check rate limit
-            is_allowed, error = current_app.api_key_service.check_rate_limit(key_data)
+                is_allowed = not is_rate_limited
 
             if not is_allowed:
+                RATE_LIMIT_REJECTIONS.labels(key_data.get('plan', 'free'), 'rate_limit').inc()
                 return jsonify({
                     'status': 'error',
                     'message': error,
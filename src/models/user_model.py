@@ -5,14 +5,16 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from typing import Dict, Any, Optional
 
 class User:
-    def __init__(self, first_name: str, last_name:  str, role :str, username: str, email: str, password: Optional[str] = None):
+    def __init__(self, first_name: str, last_name:  str, role :str, username: str, email: str, password: Optional[str] = None,
+                 password_hash: Optional[str] = None):
         self.first_name = first_name
         self.last_name = last_name
         self.username = username
         self.email = email
         self.plan = "free"  # Default plan
         self.plan_expiry = None
-        self.password_hash = generate_password_hash(password) if password else None
+        # Services pass a hash computed off-thread by PasswordHasher
+        self.password_hash = password_hash or (generate_password_hash(password) if password else None)
         self.created_at = datetime.utcnow()
         self.full_name = f"{first_name} {last_name}"
         self.role = role
@@ -2,6 +2,7 @@
 from flask import Blueprint, request, jsonify, current_app
 from src.middlewares.auth import token_required
 from src.middlewares.role_check import admin_required
+from src.services.api_key_service import PLAN_KEY_LIMITS
 from datetime import datetime
 
 bp = Blueprint('api_keys', __name__)
@@ -173,28 +174,39 @@ def get_api_key_status(current_user):
 @bp.route('/list', methods=['POST'])
 @token_required
 def list_api_keys(current_user):
-    """List all API keys with pagination from request body"""
+    """List API keys page by page; pass the returned next_cursor to continue"""
     try:
-        data = request.get_json()
-        page = data.get('page', 1)
-        limit = min(data.get('limit', 10), 50)  # Cap at 50
-
-        keys = current_app.api_key_service.get_user_api_keys(str(current_user['_id']))
+        data = request.get_json() or {}
+        limit = max(1, min(data.get('limit', 10), 50))  # Cap at 50
+        user_id = str(current_user['_id'])
+
+        api_key_service = current_app.api_key_service
+        try:
+            keys, next_cursor = api_key_service.get_user_api_keys(user_id, limit, data.get('cursor'))
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid cursor'
+            }), 400
 
-        # Simple pagination
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        paginated_keys = keys[start_idx:end_idx]
+        counts = api_key_service.get_key_counts(user_id)
+        if not counts:
+            return jsonify({
+                'status': 'error',
+                'message': 'User not found'
+            }), 404
+        max_keys = PLAN_KEY_LIMITS.get(counts['plan'], PLAN_KEY_LIMITS['free'])
 
         return jsonify({
             'status': 'success',
             'data': {
-                'keys': paginated_keys,
-                'total': len(keys),
-                'page': page,
+                'keys': keys,
+                'total': counts['api_key_count'],
+                'active': counts['active_api_key_count'],
                 'limit': limit,
-                'total_pages': (len(keys) + limit - 1) // limit,
-                'remaining_slots': 5 - len(keys)  # Based on 5 keys limit
+                'has_next': next_cursor is not None,
+                'next_cursor': next_cursor,
+                'remaining_slots': max(max_keys - counts['active_api_key_count'], 0)
             }
         }), 200
 
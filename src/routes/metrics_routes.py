@@ -0,0 +1,11 @@
+# src/routes/metrics_routes.py
+from flask import Blueprint
+from src.utils.metrics import render_metrics
+
+bp = Blueprint('metrics', __name__)
+
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus exposition; keep it reachable from the scraper's network only"""
+    return render_metrics()
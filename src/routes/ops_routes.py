@@ -0,0 +1,133 @@
+# src/routes/ops_routes.py
+import os
+from flask import Blueprint, jsonify, current_app, request, send_from_directory
+from src.middlewares.auth import token_required
+from src.middlewares.role_check import admin_required
+from src.config.schema import check_indexes
+from src.utils.profiler import PROFILE_NAME, list_profiles
+
+bp = Blueprint('ops', __name__)
+
+
+@bp.route('/upstreams', methods=['GET'])
+@token_required
+@admin_required
+def upstream_status(current_user):
+    """Circuit breaker, retry budget and hedging state per upstream provider (admin only)"""
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'providers': current_app.upstream_client.provider_status(),
+            'lookup_coalescing': current_app.lookup_flight.stats()
+        }
+    }), 200
+
+
+@bp.route('/mongo/pool', methods=['GET'])
+@token_required
+@admin_required
+def mongo_pool_stats(current_user):
+    """Connection pool counters for this worker process, per MongoDB server (admin only)"""
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'pid': os.getpid(),
+            'servers': current_app.db.pool_stats()
+        }
+    }), 200
+
+
+@bp.route('/db/commands', methods=['GET'])
+@token_required
+@admin_required
+def db_command_stats(current_user):
+    """MongoDB time per endpoint, and per endpoint/phase/collection, for this worker process (admin only)"""
+    return jsonify({
+        'status': 'success',
+        'data': dict(current_app.db_timer.stats(), pid=os.getpid())
+    }), 200
+
+
+@bp.route('/indexes', methods=['GET'])
+@token_required
+@admin_required
+def index_report(current_user):
+    """Missing, conflicting, undeclared and unused MongoDB indexes (admin only)"""
+    try:
+        return jsonify({
+            'status': 'success',
+            'data': check_indexes(current_app.db)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+
+@bp.route('/profiles', methods=['GET'])
+@token_required
+@admin_required
+def profiles(current_user):
+    """Saved request profiles (.pstats) and sampler output (.collapsed), newest first (admin only)"""
+    return jsonify({
+        'status': 'success',
+        'data': list_profiles(current_app.config['PROFILE_DIR'])
+    }), 200
+
+
+@bp.route('/profiles/<name>', methods=['GET'])
+@token_required
+@admin_required
+def download_profile(current_user, name):
+    """Download one profile artifact (admin only)"""
+    if not PROFILE_NAME.match(name):
+        return jsonify({
+            'status': 'error',
+            'message': 'Invalid profile name'
+        }), 400
+    return send_from_directory(os.path.abspath(current_app.config['PROFILE_DIR']), name, as_attachment=True)
+
+
+@bp.route('/profiler', methods=['GET'])
+@token_required
+@admin_required
+def sampling_profiler_status(current_user):
+    """State of the sampling profiler in this worker process (admin only)"""
+    return jsonify({
+        'status': 'success',
+        'data': current_app.sampling_profiler.status()
+    }), 200
+
+
+@bp.route('/profiler/start', methods=['POST'])
+@token_required
+@admin_required
+def start_sampling_profiler(current_user):
+    """Start sampling stacks in this worker process; optional body {"hz": 50} (admin only)"""
+    data = request.get_json(silent=True) or {}
+    hz = data.get('hz')
+    if hz is not None and (not isinstance(hz, (int, float)) or not 0 < hz <= 1000):
+        return jsonify({
+            'status': 'error',
+            'message': 'hz must be a number between 0 and 1000'
+        }), 400
+
+    started = current_app.sampling_profiler.start(hz)
+    return jsonify({
+        'status': 'success',
+        'message': 'Sampling profiler started' if started else 'Sampling profiler already running',
+        'data': current_app.sampling_profiler.status()
+    }), 200
+
+
+@bp.route('/profiler/stop', methods=['POST'])
+@token_required
+@admin_required
+def stop_sampling_profiler(current_user):
+    """Stop sampling in this worker process and write the collected stacks (admin only)"""
+    artifact = current_app.sampling_profiler.stop()
+    return jsonify({
+        'status': 'success',
+        'data': dict(current_app.sampling_profiler.status(), artifact=artifact)
+    }), 200
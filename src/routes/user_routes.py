@@ -40,14 +40,14 @@ def list_users(current_use):
     """Get all users with pagination (admin only)"""
     try:
         # Get and validate pagination parameters
-        page = request.args.get('page', 1, type=int)
         limit = request.args.get('limit', 10, type=int)
+        cursor = request.args.get('cursor')
+        exact_count = request.args.get('count') == 'exact'
 
         # Ensure positive values
-        page = max(1, page)
         limit = max(1, min(limit, 100))  # Cap limit at 100
 
-        return UserController.list_users(page, limit)
+        return UserController.list_users(limit, cursor, exact_count)
 
     except ValueError as e:
         return jsonify({
@@ -62,3 +62,9 @@ def create_user(current_user):
     """Create a new user (admin only)"""
     return UserController.create_user(request.get_json())
 
+@bp.route('/<user_id>/status', methods=['PUT'])
+@token_required
+@admin_required
+def set_user_status(current_user, user_id):
+    """Activate or deactivate a user and revoke their tokens (admin only)"""
+    return UserController.set_user_status(user_id, request.get_json())
@@ -1,11 +1,14 @@
 # src/routes/vehicle_routes.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from src.controllers.vehicle_controller import VehicleController
+from src.services.vehicle import get_vehicle_details_from_number, normalize_plate, parse_fields
 from src.middlewares.auth import token_required
 from datetime import datetime
 from src.middlewares.api_key_auth import require_api_key
 from src.middlewares.rate_limit import check_rate_limit
 from src.utils.security import SecurityManager
+from src.utils.metrics import RATE_LIMIT_REJECTIONS
+from src.utils.request_timing import request_phase
 import hmac
 import hashlib
 
@@ -147,7 +150,12 @@ def get_vehicle():
         if not data or 'veh_num' not in data:
             return jsonify({"error": "Vehicle number required"}), 400
 
-        veh_data = vehicle_controller.get_vehicle_details(data['veh_num'])
+        try:
+            fields = parse_fields(data.get('fields'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        veh_data = vehicle_controller.get_vehicle_details(data['veh_num'], fields)
         if isinstance(veh_data, tuple):  # Error case
             return jsonify(veh_data[0]), veh_data[1]
         return jsonify(veh_data)
@@ -167,8 +175,16 @@ def get_vehicle_api(key_data):
                 'message': 'Vehicle number is required'
             }), 400
 
+        try:
+            fields = parse_fields(data.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+
         veh_num = data['veh_num']
-        result = vehicle_controller.get_vehicle_details(veh_num)
+        result = vehicle_controller.get_vehicle_details(veh_num, fields)
         return jsonify({
             'status': 'success',
             'data': result,
@@ -185,3 +201,109 @@ def get_vehicle_api(key_data):
             'status': 'error',
             'message': f'Invalid request: {str(e)}'
         }), 400
+
+
+@bp.route('/api/lookup/batch', methods=['POST'])
+@require_api_key
+def get_vehicle_api_batch(key_data):
+    """Look up many vehicles with one API key check; results stream as NDJSON"""
+    data = request.get_json(silent=True)
+    veh_nums = data.get('veh_nums') if data else None
+    if not isinstance(veh_nums, list) or not veh_nums:
+        return jsonify({
+            'status': 'error',
+            'message': 'veh_nums must be a non-empty list of vehicle numbers'
+        }), 400
+
+    max_size = current_app.config['BATCH_MAX_SIZE']
+    if len(veh_nums) > max_size:
+        return jsonify({
+            'status': 'error',
+            'message': f'A batch may contain at most {max_size} vehicle numbers'
+        }), 400
+
+    # Normalize and de-duplicate, keeping request order
+    normalized = [normalize_plate(str(v)) if v else '' for v in veh_nums]
+    invalid = [v for v, plate in zip(veh_nums, normalized) if not plate]
+    if invalid:
+        return jsonify({
+            'status': 'error',
+            'message': f'Invalid vehicle numbers: {", ".join(repr(v) for v in invalid[:10])}'
+        }), 400
+    plates = list(dict.fromkeys(normalized))
+
+    with request_phase('quota'):
+        is_allowed, error = current_app.api_key_service.consume_quota(key_data, len(plates))
+    if not is_allowed:
+        RATE_LIMIT_REJECTIONS.labels(key_data.get('plan', 'free'), 'quota').inc()
+        return jsonify({
+            'status': 'error',
+            'message': error,
+            'error_code': 'RATE_LIMIT_EXCEEDED'
+        }), 429
+
+    def generate():
+        results = current_app.lookup_engine.lookup_many(
+            plates,
+            get_vehicle_details_from_number,
+            max_parallel=current_app.config['BATCH_MAX_PARALLEL']
+        )
+        for veh_num, result, error in results:
+            if error:
+                line = {'veh_num': veh_num, 'status': 'error', 'message': error}
+            else:
+                line = {'veh_num': veh_num, 'status': 'success', 'data': result}
+            yield current_app.json.dumps(line) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@bp.route('/jobs', methods=['POST'])
+@check_rate_limit
+def submit_lookup_job(key_data):
+    """Queue a vehicle lookup and return its job id"""
+    try:
+        data = request.get_json()
+        if not data or 'veh_num' not in data:
+            return jsonify({
+                'status': 'error',
+                'message': 'Vehicle number is required'
+            }), 400
+
+        job, error = current_app.lookup_job_service.submit(
+            normalize_plate(data['veh_num']),
+            str(key_data['user_id'])
+        )
+        if error:
+            return jsonify({
+                'status': 'error',
+                'message': error
+            }), 500
+
+        return jsonify({
+            'status': 'success',
+            'data': job
+        }), 202
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Invalid request: {str(e)}'
+        }), 400
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@require_api_key
+def get_lookup_job(key_data, job_id):
+    """Poll a lookup job; polling does not count against the quota"""
+    job = current_app.lookup_job_service.get_job(job_id, str(key_data['user_id']))
+    if not job:
+        return jsonify({
+            'status': 'error',
+            'message': 'Job not found'
+        }), 404
+
+    return jsonify({
+        'status': 'success',
+        'data': job
+    }), 200
@@ -1,18 +1,116 @@
 # src/services/api_key_service.py
+from copy import deepcopy
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, Any, List, Tuple, Optional
+import threading
+import time
+from typing import Dict, Any, List, Tuple, Optional, Callable
 from bson import ObjectId
+from pymongo import ReturnDocument
 from ..models.api_key import APIKey
+from ..utils.pagination import decode_cursor, keyset_filter, split_page
+from ..utils.concurrency import ProcessThread
+from ..utils.single_flight import SingleFlight
+from ..utils.ttl_cache import TTLCache
+
+# Requests per day for each plan
+PLAN_DAILY_LIMITS = {
+    'free': 1000,  # 1000 requests per day
+    'basic': 5000,  # 5000 requests per day
+    'premium': 20000,  # 20000 requests per day
+    'enterprise': 100000  # 100000 requests per day
+}
+
+# Requests per window (seconds) for each plan
+PLAN_RATE_LIMITS = {
+    'free': {'requests': 100, 'window': 60},  # 100 per minute
+    'basic': {'requests': 200, 'window': 60},  # 200 per minute
+    'premium': {'requests': 600, 'window': 60},  # 600 per minute
+    'enterprise': {'requests': 1, 'window': 1}  # 1 per second
+}
+
+# Active API keys each plan may hold
+PLAN_KEY_LIMITS = {
+    'free': 100,
+    'basic': 500,
+    'premium': 1000,
+    'enterprise': 2000
+}
+
+# Sort key and fields for the per-user key listing
+KEY_LIST_SORT = ('created_at', '_id')
+KEY_LIST_CURSOR_TYPES = (datetime, ObjectId)
+KEY_LIST_FIELDS = {
+    'api_key': 1, 'name': 1, 'plan': 1, 'is_active': 1, 'created_at': 1,
+    'last_used': 1, 'daily_limit': 1, 'daily_usage': 1
+}
+
+
+def daily_limit(key_data: Dict[str, Any]) -> int:
+    """The key's own daily limit, falling back to its plan's default"""
+    plan_limit = PLAN_DAILY_LIMITS.get(key_data.get('plan', 'free'), PLAN_DAILY_LIMITS['free'])
+    return key_data.get('daily_limit', plan_limit)
 
 
 class APIKeyService:
-    def __init__(self, db):
+    def __init__(self, db, url_key_ttl: int = 300, url_key_discovery_interval: float = 60,
+                 key_cache_ttl: float = 30, key_cache_size: int = 10000, key_cache_version_interval: float = 2):
         self.db = db
         self.url_key_collection = db.url_key
         self.api_keys_collection = db.api_keys
+        self.meta_collection = db.api_key_meta
         self.logger = logging.getLogger(__name__)
 
+        # Key metadata cache; a shared version stamp lets other workers
+        # notice revocations within key_cache_version_interval seconds
+        self.key_cache_version_interval = key_cache_version_interval
+        self._key_cache = TTLCache(key_cache_size, key_cache_ttl)
+        self._key_cache_version = None
+        self._key_cache_version_checked_at = 0.0
+
+        # carinfo build id, cached in process memory
+        self.url_key_ttl = url_key_ttl
+        self._url_key = None
+        self._url_key_loaded_at = 0.0
+        self.url_key_discovery_interval = url_key_discovery_interval
+        self._url_key_discovered_at = 0.0
+        self._url_key_lock = threading.Lock()
+        self._url_key_flight = SingleFlight()
+        self._url_key_refresher = ProcessThread(self._refresh_url_key_loop, 'url-key-refresher')
+
+    def get_key_counts(self, user_id: str, user: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Plan and maintained key counters (api_key_count, active_api_key_count) for a user.
+
+        Users created before the counters existed are backfilled once from the keys collection.
+        """
+        if user is None:
+            user = self.db.users.find_one(
+                {"_id": ObjectId(user_id)},
+                {"plan": 1, "api_key_count": 1, "active_api_key_count": 1}
+            )
+            if not user:
+                return None
+        counts = {
+            'plan': user.get('plan', 'free'),
+            'api_key_count': user.get('api_key_count'),
+            'active_api_key_count': user.get('active_api_key_count')
+        }
+        if counts['api_key_count'] is None or counts['active_api_key_count'] is None:
+            counts['api_key_count'] = self.api_keys_collection.count_documents({"user_id": user_id})
+            counts['active_api_key_count'] = self.api_keys_collection.count_documents({
+                "user_id": user_id,
+                "is_active": True
+            })
+            # Only set when still missing, so a concurrent $inc is not overwritten
+            self.db.users.update_one(
+                {"_id": ObjectId(user_id), "api_key_count": {"$exists": False}},
+                {"$set": {
+                    "api_key_count": counts['api_key_count'],
+                    "active_api_key_count": counts['active_api_key_count']
+                }}
+            )
+        return counts
+
     def create_api_key(self, user_id: str, name: str) -> Tuple[Dict[str, Any], Optional[str]]:
         """Create new API key for user based on their plan"""
         try:
@@ -25,21 +123,14 @@ class APIKeyService:
             if user.get('plan_expiry') and datetime.utcnow() > user['plan_expiry']:
                 return None, "Subscription plan has expired"
 
-            # Check existing keys count and limit based on plan
-            plan_limits = {
-                'free': 100,
-                'basic': 500,
-                'premium': 1000,
-                'enterprise': 2000
-            }
-            max_keys = plan_limits.get(user['plan'], 100)  # Default to free plan limit
-
-            existing_keys = self.api_keys_collection.count_documents({
-                "user_id": user_id,
-                "is_active": True
-            })
-
-            if existing_keys >= max_keys:
+            # Reserve a slot on the user's active key counter, limited by plan
+            max_keys = PLAN_KEY_LIMITS.get(user['plan'], PLAN_KEY_LIMITS['free'])
+            self.get_key_counts(user_id, user)
+            reserved = self.db.users.update_one(
+                {"_id": user['_id'], "active_api_key_count": {"$lt": max_keys}},
+                {"$inc": {"api_key_count": 1, "active_api_key_count": 1}}
+            )
+            if not reserved.modified_count:
                 return None, f"Maximum API keys limit reached ({max_keys}) for your plan"
 
             # Get plan configurations
@@ -61,8 +152,16 @@ class APIKeyService:
             )
 
             key_data = api_key.to_dict()
-            result = self.api_keys_collection.insert_one(key_data)
+            try:
+                result = self.api_keys_collection.insert_one(key_data)
+            except Exception:
+                self.db.users.update_one(
+                    {"_id": user['_id']},
+                    {"$inc": {"api_key_count": -1, "active_api_key_count": -1}}
+                )
+                raise
             key_data['_id'] = str(result.inserted_id)
+            self.invalidate_key_cache(key_data['api_key'])
 
             return key_data, None
 
@@ -128,154 +227,159 @@ class APIKeyService:
     #         return True, None  # Allow request on error
     #
 
-    def check_rate_limit(self, key_data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    @staticmethod
+    def _plan_switch(values: Dict[str, Any], default: Any) -> Dict[str, Any]:
+        return {'$switch': {
+            'branches': [{'case': {'$eq': ['$plan', plan]}, 'then': value} for plan, value in values.items()],
+            'default': default
+        }}
+
+    def _quota_update(self, count: int = 1,
+                      check_window: bool = True) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Filter condition and update pipeline that charge `count` requests.
+
+        The condition ($expr) only matches while the key's daily limit and, with
+        check_window, its per-window limit still allow the whole amount, so a
+        rejected request writes nothing. The pipeline resets expired windows.
         """
-        Check both rate limits and daily usage limits
-        Returns: (is_allowed, error_message)
+        key_daily_limit = {'$ifNull': [
+            '$daily_limit', self._plan_switch(PLAN_DAILY_LIMITS, PLAN_DAILY_LIMITS['free'])
+        ]}
+        window_limit = self._plan_switch(
+            {plan: limit['requests'] for plan, limit in PLAN_RATE_LIMITS.items()},
+            PLAN_RATE_LIMITS['free']['requests']
+        )
+        window_ms = self._plan_switch(
+            {plan: limit['window'] * 1000 for plan, limit in PLAN_RATE_LIMITS.items()},
+            PLAN_RATE_LIMITS['free']['window'] * 1000
+        )
+
+        def expired(field, span_ms):
+            return {'$or': [
+                {'$eq': [{'$ifNull': [field, None]}, None]},
+                {'$gte': [{'$subtract': ['$$NOW', field]}, span_ms]}
+            ]}
+
+        day_reset = expired('$last_daily_reset', 86400 * 1000)
+        window_reset = expired('$last_reset', window_ms)
+        daily_used = {'$cond': [day_reset, 0, {'$ifNull': ['$daily_usage', 0]}]}
+        window_used = {'$cond': [window_reset, 0, {'$ifNull': ['$requests_count', 0]}]}
+
+        allowed = [{'$lte': [{'$add': [daily_used, count]}, key_daily_limit]}]
+        if check_window:
+            allowed.append({'$lte': [{'$add': [window_used, count]}, window_limit]})
+
+        # One $set stage: every expression sees the document as it was before the update
+        pipeline = [{'$set': {
+            'daily_usage': {'$add': [daily_used, count]},
+            'requests_count': {'$add': [window_used, count if check_window else 0]},
+            'last_daily_reset': {'$cond': [day_reset, '$$NOW', '$last_daily_reset']},
+            'last_reset': {'$cond': [window_reset, '$$NOW', '$last_reset']},
+            'last_used': '$$NOW'
+        }}]
+        return {'$and': allowed}, pipeline
+
+    @staticmethod
+    def _daily_used(key_data: Dict[str, Any], current_time: datetime) -> int:
+        last_daily_reset = key_data.get('last_daily_reset')
+        if last_daily_reset is None or current_time - last_daily_reset >= timedelta(days=1):
+            return 0
+        return key_data.get('daily_usage', 0)
+
+    def _quota_error(self, key_data: Dict[str, Any], count: int = 1) -> str:
+        """Explain why the atomic quota update refused the request"""
+        current_time = datetime.utcnow()
+        plan = key_data.get('plan', 'free')
+        limit = daily_limit(key_data)
+        daily_used = self._daily_used(key_data, current_time)
+
+        if daily_used + count > limit:
+            if not daily_used:
+                return f"Daily limit exceeded. Limit is {limit} requests per day"
+            next_reset = key_data['last_daily_reset'] + timedelta(days=1)
+            wait_hours = (next_reset - current_time).total_seconds() / 3600
+            return f"Daily limit exceeded. Resets in {int(wait_hours)} hours"
+
+        limit_config = PLAN_RATE_LIMITS.get(plan, PLAN_RATE_LIMITS['free'])
+        wait_time = limit_config['window'] - (current_time - key_data['last_reset']).total_seconds()
+        return (
+            f"Rate limit exceeded. "
+            f"Limit is {limit_config['requests']} requests per "
+            f"{limit_config['window']} seconds. "
+            f"Please wait {max(int(wait_time), 1)} seconds."
+        )
+
+    def consume_request(self, api_key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str], bool]:
         """
+        Validate an API key and charge one request in a single find_one_and_update
+        Returns: (key_data, error_message, is_rate_limited)
+        Database errors propagate, so an outage is not mistaken for a bad key.
+        """
+        allowed, pipeline = self._quota_update()
+        key_data = self.api_keys_collection.find_one_and_update(
+            {"api_key": api_key, "is_active": True, "$expr": allowed},
+            pipeline,
+            return_document=ReturnDocument.AFTER
+        )
+        if key_data:
+            return key_data, None, False
+
+        # Slow path only for rejected requests: unknown, inactive or over a limit
+        key_data = self.api_keys_collection.find_one({"api_key": api_key})
+        if not key_data:
+            return None, "Invalid API key", False
+        if not key_data['is_active']:
+            return None, "API key is inactive", False
+        return key_data, self._quota_error(key_data), True
+
+    def _check_key_cache_version(self):
+        """Drop the key cache when another process has bumped the shared version"""
+        now = time.time()
+        if now - self._key_cache_version_checked_at < self.key_cache_version_interval:
+            return
+        self._key_cache_version_checked_at = now
+
+        meta = self.meta_collection.find_one({"_id": "key_cache"}, {"version": 1})
+        version = meta['version'] if meta else 0
+        if version != self._key_cache_version:
+            self._key_cache.clear()
+            self._key_cache_version = version
+
+    def _find_key(self, api_key: str, cached: bool) -> Optional[Dict[str, Any]]:
+        if not cached:
+            return self.api_keys_collection.find_one({"api_key": api_key})
+
+        self._check_key_cache_version()
+        found, key_data = self._key_cache.get(api_key)
+        if found:
+            return deepcopy(key_data)
+
+        # Unknown keys are cached too, so invalid-key floods stay off the DB
+        key_data = self.api_keys_collection.find_one({"api_key": api_key})
+        self._key_cache.set(api_key, key_data)
+        return deepcopy(key_data)
+
+    def invalidate_key_cache(self, api_key: str):
+        """Evict a key locally and bump the shared version so other workers evict it too"""
+        self._key_cache.pop(api_key)
         try:
-            current_time = datetime.utcnow()
-
-            # First, check daily usage
-            daily_limits = {
-                'free': 1000,  # 1000 requests per day
-                'basic': 5000,  # 5000 requests per day
-                'premium': 20000,  # 20000 requests per day
-                'enterprise': 100000  # 100000 requests per day
-            }
-
-            plan = key_data.get('plan', 'free')
-            daily_limit = daily_limits.get(plan, daily_limits['free'])
-
-            # Check if we need to reset daily usage
-            last_reset_daily = key_data.get('last_daily_reset')
-            if last_reset_daily:
-                if isinstance(last_reset_daily, str):
-                    last_reset_daily = datetime.fromisoformat(last_reset_daily.replace('Z', '+00:00'))
-
-                days_passed = (current_time - last_reset_daily).days
-
-                if days_passed >= 1:
-                    # Reset daily usage
-                    self.api_keys_collection.update_one(
-                        {"_id": key_data['_id']},
-                        {
-                            "$set": {
-                                "daily_usage": 1,
-                                "last_daily_reset": current_time
-                            }
-                        }
-                    )
-                else:
-                    # Check daily limit
-                    daily_usage = key_data.get('daily_usage', 0)
-                    if daily_usage >= daily_limit:
-                        next_reset = last_reset_daily + timedelta(days=1)
-                        wait_hours = (next_reset - current_time).total_seconds() / 3600
-                        return False, f"Daily limit exceeded. Resets in {int(wait_hours)} hours"
-
-            else:
-                # Initialize daily tracking
-                self.api_keys_collection.update_one(
-                    {"_id": key_data['_id']},
-                    {
-                        "$set": {
-                            "daily_usage": 1,
-                            "last_daily_reset": current_time
-                        }
-                    }
-                )
-
-            # Now check rate limits (per minute/second)
-            rate_limits = {
-                'free': {'requests': 100, 'window': 60},  # 100 per minute
-                'basic': {'requests': 200, 'window': 60},  # 200 per minute
-                'premium': {'requests': 600, 'window': 60},  # 600 per minute
-                'enterprise': {'requests': 1, 'window': 1}  # 1 per second
-            }
-
-            limit_config = rate_limits.get(plan, rate_limits['free'])
-
-            # Check rate limit window
-            last_reset = key_data.get('last_reset')
-            if not last_reset:
-                # First request, initialize the window
-                self.api_keys_collection.update_one(
-                    {"_id": key_data['_id']},
-                    {
-                        "$set": {
-                            "requests_count": 1,
-                            "last_reset": current_time,
-                            "last_used": current_time
-                        },
-                        "$inc": {"daily_usage": 1}
-                    }
-                )
-                return True, None
-
-            if isinstance(last_reset, str):
-                last_reset = datetime.fromisoformat(last_reset.replace('Z', '+00:00'))
-
-            time_diff = (current_time - last_reset).total_seconds()
-
-            # Check if we need to reset the rate limit window
-            if time_diff >= limit_config['window']:
-                # Start new window
-                self.api_keys_collection.update_one(
-                    {"_id": key_data['_id']},
-                    {
-                        "$set": {
-                            "requests_count": 1,
-                            "last_reset": current_time,
-                            "last_used": current_time
-                        },
-                        "$inc": {"daily_usage": 1}
-                    }
-                )
-                return True, None
-
-            # Check rate limit
-            current_count = key_data.get('requests_count', 0)
-            if current_count >= limit_config['requests']:
-                wait_time = limit_config['window'] - time_diff
-                return False, (
-                    f"Rate limit exceeded. "
-                    f"Limit is {limit_config['requests']} requests per "
-                    f"{limit_config['window']} seconds. "
-                    f"Please wait {int(wait_time)} seconds."
-                )
-
-            # Update counters
-            self.api_keys_collection.update_one(
-                {"_id": key_data['_id']},
-                {
-                    "$inc": {
-                        "requests_count": 1,
-                        "daily_usage": 1
-                    },
-                    "$set": {"last_used": current_time}
-                }
+            meta = self.meta_collection.find_one_and_update(
+                {"_id": "key_cache"},
+                {"$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
             )
-
-            # Add debug logging
-            self.logger.debug(
-                f"Usage check - Plan: {plan}, "
-                f"Rate: {current_count + 1}/{limit_config['requests']}, "
-                f"Daily: {key_data.get('daily_usage', 0) + 1}/{daily_limit}"
-            )
-
-            return True, None
-
+            self._key_cache_version = meta['version']
         except Exception as e:
-            self.logger.error(f"Error checking usage limits: {str(e)}", exc_info=True)
-            return True, None  # Allow request on error
+            self.logger.error(f"Error bumping key cache version: {str(e)}")
 
-
-
-    def validate_api_key(self, api_key: str) -> Tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
-        """Validate API key and check usage limits"""
+    def validate_api_key(self, api_key: str, charge_usage: bool = True,
+                         cached: bool = False) -> Tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+        """Validate API key and check usage limits; cached=True serves key metadata from the
+        short-lived key cache. charge_usage=False only checks the key exists and is active:
+        the caller's limiter owns the daily window, so no reset or daily gate runs here."""
         try:
-            key_data = self.api_keys_collection.find_one({"api_key": api_key})
+            key_data = self._find_key(api_key, cached)
 
             if not key_data:
                 return False, None, "Invalid API key"
@@ -283,6 +387,9 @@ class APIKeyService:
             if not key_data['is_active']:
                 return False, None, "API key is inactive"
 
+            if not charge_usage:
+                return True, key_data, None
+
             # Reset daily usage if needed
             if (datetime.utcnow() - key_data['last_reset']).days > 0:
                 self.api_keys_collection.update_one(
@@ -295,9 +402,11 @@ class APIKeyService:
                     }
                 )
                 key_data['daily_usage'] = 0
+                if cached:
+                    self._key_cache.pop(api_key)
 
             # Check daily limit
-            if key_data['daily_usage'] >= key_data['daily_limit']:
+            if key_data['daily_usage'] >= daily_limit(key_data):
                 return False, key_data, "Daily API limit exceeded"
 
             # Check rate limit
@@ -318,16 +427,56 @@ class APIKeyService:
             self.logger.error(f"Error validating API key: {str(e)}")
             return False, None, str(e)
 
-    def get_user_api_keys(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get all API keys for a user"""
+    def consume_quota(self, key_data: Dict[str, Any], count: int) -> Tuple[bool, Optional[str]]:
+        """Atomically charge `count` requests against the key's daily limit.
+
+        The increment only applies if the whole amount still fits, so a batch
+        is either charged in full or rejected.
+        """
         try:
-            keys = list(self.api_keys_collection.find({"user_id": user_id}))
+            allowed, pipeline = self._quota_update(count, check_window=False)
+            updated = self.api_keys_collection.find_one_and_update(
+                {"_id": key_data['_id'], "is_active": True, "$expr": allowed},
+                pipeline,
+                return_document=ReturnDocument.AFTER
+            )
+            if updated:
+                key_data.update(updated)
+                return True, None
+
+            current = self.api_keys_collection.find_one({"_id": key_data['_id']})
+            if not current or not current['is_active']:
+                return False, "API key is inactive"
+            key_data.update(current)
+            remaining = max(daily_limit(current) - self._daily_used(current, datetime.utcnow()), 0)
+            return False, f"Daily limit exceeded. {count} requests needed, {remaining} remaining"
+
+        except Exception as e:
+            self.logger.error(f"Error consuming quota: {str(e)}")
+            return False, str(e)
+
+    def get_user_api_keys(self, user_id: str, limit: int = 10,
+                          cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of a user's API keys, newest first, continuing after `cursor`.
+
+        Returns (keys, next_cursor); raises ValueError for a malformed cursor.
+        """
+        query = {"user_id": user_id}
+        if cursor:
+            query.update(keyset_filter(KEY_LIST_SORT, decode_cursor(cursor, KEY_LIST_CURSOR_TYPES)))
+        try:
+            docs = list(
+                self.api_keys_collection.find(query, KEY_LIST_FIELDS)
+                .sort([('created_at', -1), ('_id', -1)])
+                .limit(limit + 1)
+            )
+            keys, next_cursor = split_page(docs, KEY_LIST_SORT, limit)
             for key in keys:
                 key['_id'] = str(key['_id'])
-            return keys
+            return keys, next_cursor
         except Exception as e:
             self.logger.error(f"Error fetching API keys: {str(e)}")
-            return []
+            return [], None
 
     def revoke_api_key(self, user_id: str, api_key: str) -> Tuple[bool, Optional[str]]:
         """Revoke an API key"""
@@ -337,10 +486,70 @@ class APIKeyService:
                 {"$set": {"is_active": False}}
             )
             if result.modified_count:
+                self.invalidate_key_cache(api_key)
+                self.db.users.update_one(
+                    {"_id": ObjectId(user_id), "active_api_key_count": {"$gt": 0}},
+                    {"$inc": {"active_api_key_count": -1}}
+                )
                 return True, None
             return False, "API key not found"
         except Exception as e:
             self.logger.error(f"Error revoking API key: {str(e)}")
             return False, str(e)
-    def get_url_key(self):
-        return self.url_key_collection.find_one({"url_data": "url_key"})['value']
\ No newline at end of file
+    def get_url_key(self) -> str:
+        """Current carinfo build id, served from memory and reloaded after url_key_ttl"""
+        self._url_key_refresher.ensure_started()
+        if self._url_key is None or time.time() - self._url_key_loaded_at > self.url_key_ttl:
+            return self.refresh_url_key()
+        return self._url_key
+
+    def refresh_url_key(self, stale_key: Optional[str] = None,
+                        discover: Optional[Callable[[], Optional[str]]] = None) -> str:
+        """Reload the build id; concurrent callers share a single reload.
+
+        If the stored value is still the `stale_key` that upstream rejected,
+        `discover` is asked for the live build id, which is then persisted.
+        Discovery runs at most once per url_key_discovery_interval seconds.
+        """
+        # A rejected key must not join a routine TTL reload that may predate the 404
+        flight_key = f'url_key_rotate:{stale_key}' if stale_key else 'url_key'
+        url_key, _ = self._url_key_flight.do(flight_key, self._load_url_key, stale_key, discover)
+        return url_key
+
+    def _load_url_key(self, stale_key: Optional[str], discover: Optional[Callable[[], Optional[str]]]) -> str:
+        if stale_key and self._url_key and self._url_key != stale_key:
+            # Another caller already rotated the key
+            return self._url_key
+
+        url_key = self.url_key_collection.find_one({"url_data": "url_key"})['value']
+
+        if stale_key and url_key == stale_key and discover and self._may_discover_url_key():
+            discovered = discover()
+            if discovered and discovered != stale_key:
+                self.url_key_collection.update_one(
+                    {"url_data": "url_key"},
+                    {"$set": {"value": discovered, "updated_at": datetime.utcnow()}}
+                )
+                self.logger.info(f"carinfo build id rotated: {stale_key} -> {discovered}")
+                url_key = discovered
+
+        self._url_key = url_key
+        self._url_key_loaded_at = time.time()
+        return url_key
+
+    def _may_discover_url_key(self) -> bool:
+        # Failed discoveries count too, so a broken page is not scraped on every 404
+        now = time.time()
+        with self._url_key_lock:
+            if now - self._url_key_discovered_at < self.url_key_discovery_interval:
+                return False
+            self._url_key_discovered_at = now
+            return True
+
+    def _refresh_url_key_loop(self):
+        while True:
+            time.sleep(max(self.url_key_ttl / 2, 1))
+            try:
+                self.refresh_url_key()
+            except Exception as e:
+                self.logger.error(f"Error refreshing url key: {str(e)}")
@@ -0,0 +1,46 @@
+# src/services/auth_context_cache.py
+import hashlib
+from typing import Dict, Any, Optional
+from bson import ObjectId
+from src.utils.ttl_cache import TTLCache
+
+# The only user fields request middleware and handlers read from current_user
+AUTH_CONTEXT_FIELDS = ('username', 'email', 'first_name', 'last_name', 'full_name', 'role', 'is_active', 'plan')
+
+
+class AuthContextCache:
+    """Caches decoded JWT payloads (by token hash, until expiry) and the
+    slim per-user auth context that token_required needs."""
+
+    def __init__(self, users_collection, ttl: float = 60, max_size: int = 10000):
+        self.users_collection = users_collection
+        self.ttl = ttl
+        self.max_size = max_size
+        self._payloads = TTLCache(max_size)
+        self._users = TTLCache(max_size, ttl)
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get_payload(self, token: str) -> Optional[Dict[str, Any]]:
+        found, payload = self._payloads.get(self._token_key(token))
+        return dict(payload) if found else None
+
+    def put_payload(self, token: str, payload: Dict[str, Any]):
+        if 'exp' in payload:
+            self._payloads.set(self._token_key(token), dict(payload), expires_at=float(payload['exp']))
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Slim auth context for user_id, read through to Mongo with a projection"""
+        found, user = self._users.get(user_id)
+        if not found:
+            projection = {field: 1 for field in AUTH_CONTEXT_FIELDS}
+            user = self.users_collection.find_one({'_id': ObjectId(user_id)}, projection)
+            if user:
+                user['_id'] = str(user['_id'])
+            self._users.set(user_id, user)
+        return dict(user) if user else None
+
+    def invalidate_user(self, user_id: str):
+        self._users.pop(str(user_id))
@@ -4,14 +4,24 @@ import jwt
 from flask import current_app
 
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 import logging
 from typing import Dict, Any
+from src.utils.db_errors import duplicate_key_field
+
+# Fields login needs: the credential plus what goes into the token and response
+LOGIN_PROJECTION = {
+    'password_hash': 1, 'username': 1, 'email': 1, 'first_name': 1, 'last_name': 1,
+    'full_name': 1, 'role': 1, 'plan': 1, 'is_active': 1, 'token_epoch': 1, 'last_login': 1
+}
 
 
 class AuthService:
-    def __init__(self, db):
+    def __init__(self, db, password_hasher, auth_context_cache=None):
         self.db = db
         self.users_collection = db.users
+        self.password_hasher = password_hasher
+        self.auth_context_cache = auth_context_cache
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
@@ -29,23 +39,20 @@ class AuthService:
             if len(password) < 6:
                 return None, "Password must be at least 6 characters long"
 
-            # Check if user already exists
-            existing_user = self.users_collection.find_one(
-                {"$or": [{"username": username}, {"email": email}]}
-            )
-            if existing_user:
-                if existing_user.get('username') == username:
-                    return None, "Username already exists"
-                return None, "Email already exists"
-
             # Create new user
             role = 'user'
-            user = User(first_name, last_name, role, username, email, password)
+            password_hash = self.password_hasher.hash(password)
+            user = User(first_name, last_name, role, username, email, password_hash=password_hash)
             user_data = user.to_dict()
             user_data['password_hash'] = user.password_hash
 
-            # Insert into database
-            result = self.users_collection.insert_one(user_data)
+            # Insert into database; the unique indexes reject existing users
+            try:
+                result = self.users_collection.insert_one(user_data)
+            except DuplicateKeyError as e:
+                if duplicate_key_field(e) == 'email':
+                    return None, "Email already exists"
+                return None, "Username already exists"
 
             # Prepare response
             response_data = user_data.copy()
@@ -61,33 +68,31 @@ class AuthService:
 
     def login_user(self, username, password):
         try:
-            # Find user
-
-            user_data = self.users_collection.find_one({
-                "email": username
-            })
-
-            if not user_data:
-                user_data = self.users_collection.find_one({
-                    "username": username
-                })
-            if not user_data:
+            # Find user by email or username in one indexed query. One user's
+            # username can equal another's email, so prefer the email match.
+            matches = list(self.users_collection.find(
+                {"$or": [{"email": username}, {"username": username}]},
+                LOGIN_PROJECTION
+            ).limit(2))
+            if not matches:
                 return None, "User not found"
+            user_data = next((user for user in matches if user.get('email') == username), matches[0])
 
-            # Check password
-            user = User(
-                user_data['first_name'],
-                user_data['last_name'],
-                user_data['username'],
-                user_data['email'],
-                ''
-            )
-            user.password_hash = user_data['password_hash']
-
-            if not user.check_password(password):
+            # Check password (off-thread, in the hashing pool)
+            if not self.password_hasher.verify(user_data.get('password_hash'), password):
                 self.logger.warning(f"Invalid password attempt for user: {username}")
                 return None, "Invalid password"
 
+            # Transparently upgrade hashes made with old parameters
+            if self.password_hasher.needs_rehash(user_data['password_hash']):
+                try:
+                    self.users_collection.update_one(
+                        {"_id": user_data['_id']},
+                        {"$set": {"password_hash": self.password_hasher.hash(password)}}
+                    )
+                except Exception as e:
+                    self.logger.error(f"Error rehashing password: {str(e)}")
+
             # Convert ObjectId to string
             user_data['_id'] = str(user_data['_id'])
 
@@ -96,7 +101,7 @@ class AuthService:
 
             # Prepare response
             response_data = user_data
-            # response_data['_id'] = user_data['_id']
+            del response_data['password_hash']
 
             self.logger.info(f"User logged in successfully: {username}")
             return {
@@ -117,6 +122,9 @@ class AuthService:
                 'user_id': str(user_data['_id']),
                 'username': user_data['username'],
                 'full_name': f"{user_data['first_name']} {user_data['last_name']}",
+                'role': user_data.get('role', 'user'),
+                'is_active': user_data.get('is_active', True),
+                'tep': user_data.get('token_epoch', 0),
                 'exp': datetime.utcnow() + timedelta(days=1),
                 'iat': datetime.utcnow()
             }
@@ -192,6 +200,8 @@ class AuthService:
                 {"_id": ObjectId(user_id)},
                 {"$set": update_data}
             )
+            if self.auth_context_cache is not None:
+                self.auth_context_cache.invalidate_user(user_id)
 
             if result.modified_count:
                 return self.get_user_by_id(user_id)
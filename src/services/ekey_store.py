@@ -0,0 +1,52 @@
+# src/services/ekey_store.py
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from src.utils.ttl_cache import TTLCache
+
+
+class EkeyStore:
+    """Acko proposal ekeys per registration number, in memory and in Mongo"""
+
+    def __init__(self, db, ttl: int = 7 * 86400, max_size: int = 50000):
+        self.collection = db.acko_ekeys
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = TTLCache(max_size, ttl)
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, number: str) -> Optional[str]:
+        found, ekey = self._entries.get(number)
+        if found:
+            return ekey
+
+        try:
+            doc = self.collection.find_one({'_id': number, 'expires_at': {'$gt': datetime.utcnow()}})
+        except Exception as e:
+            self.logger.error(f"Error reading ekey store: {str(e)}")
+            return None
+        if not doc:
+            return None
+
+        remaining = (doc['expires_at'] - datetime.utcnow()).total_seconds()
+        self._entries.set(number, doc['ekey'], expires_at=time.time() + remaining)
+        return doc['ekey']
+
+    def set(self, number: str, ekey: str):
+        self._entries.set(number, ekey)
+        try:
+            self.collection.replace_one(
+                {'_id': number},
+                {'ekey': ekey, 'expires_at': datetime.utcnow() + timedelta(seconds=self.ttl)},
+                upsert=True
+            )
+        except Exception as e:
+            self.logger.error(f"Error writing ekey store: {str(e)}")
+
+    def discard(self, number: str):
+        self._entries.pop(number)
+        try:
+            self.collection.delete_one({'_id': number})
+        except Exception as e:
+            self.logger.error(f"Error discarding ekey: {str(e)}")
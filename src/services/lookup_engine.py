@@ -0,0 +1,123 @@
+# src/services/lookup_engine.py
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from src.services.vehicledata import get_vehicle_details, getChallan
+from src.utils.concurrency import app_context_task
+
+# Upstream legs needed to fill each field of a lookup response
+FIELD_LEGS = {
+    'vehNum': (),
+    'header_element': ('challan',),
+    'challans': ('challan',),
+    'onwer_name': ('vehicle',),
+    'vehicleDetails': ('vehicle',)
+}
+
+
+class LookupResult:
+    """Per-leg results, errors and timings (ms) of a single vehicle lookup"""
+
+    def __init__(self, number: str):
+        self.number = number
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self.total_ms = 0.0
+
+    def ok(self, leg: str) -> bool:
+        return leg in self.results and leg not in self.errors
+
+
+class LookupEngine:
+    """Fans a lookup out to the upstream legs in parallel on a bounded pool"""
+
+    def __init__(self, max_workers: int = 16, leg_timeout: Optional[float] = None, batch_workers: int = 32):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='lookup')
+        # Whole lookups of a batch run on their own pool so they never wait on their own legs
+        self.batch_executor = ThreadPoolExecutor(max_workers=batch_workers, thread_name_prefix='lookup-batch')
+        self.leg_timeout = leg_timeout
+        self.legs: Dict[str, Callable[[str], Any]] = {
+            'challan': getChallan,
+            'vehicle': get_vehicle_details
+        }
+        self.logger = logging.getLogger(__name__)
+
+    def plan_legs(self, fields: Optional[Iterable[str]] = None) -> List[str]:
+        """Legs required to answer the requested fields (all legs when fields is None)"""
+        if fields is None:
+            return list(self.legs)
+        needed = {leg for field in fields for leg in FIELD_LEGS[field]}
+        return [leg for leg in self.legs if leg in needed]
+
+    def _timed(self, result: LookupResult, leg: str, fn: Callable[[str], Any]) -> Callable[[], Any]:
+        def run():
+            started = time.perf_counter()
+            try:
+                return fn(result.number)
+            finally:
+                result.timings[leg] = round((time.perf_counter() - started) * 1000, 2)
+        return app_context_task(run)
+
+    def lookup(self, number: str, legs: Optional[Iterable[str]] = None) -> LookupResult:
+        """Run each requested leg exactly once, concurrently, and collect the results"""
+        result = LookupResult(number)
+        started = time.perf_counter()
+
+        futures = {
+            self.executor.submit(self._timed(result, leg, self.legs[leg])): leg
+            for leg in (legs if legs is not None else self.legs)
+        }
+        done, pending = wait(futures, timeout=self.leg_timeout)
+
+        for future in done:
+            leg = futures[future]
+            try:
+                result.results[leg] = future.result()
+            except Exception as e:
+                self.logger.error(f"Lookup leg '{leg}' failed for {number}: {str(e)}")
+                result.errors[leg] = str(e)
+
+        for future in pending:
+            leg = futures[future]
+            future.cancel()
+            self.logger.warning(f"Lookup leg '{leg}' timed out for {number}")
+            result.errors[leg] = 'timeout'
+
+        result.total_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.logger.debug(f"Lookup {number} took {result.total_ms}ms, legs: {result.timings}")
+        return result
+
+    def lookup_many(self, numbers: List[str], fetch: Callable[[str], Any],
+                    max_parallel: int = 8) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """Run fetch for each number with at most max_parallel in flight.
+
+        Yields (number, result, error) in completion order.
+        """
+        task = app_context_task(fetch)
+        pending_numbers = iter(numbers)
+        in_flight = {}
+
+        def submit_next():
+            number = next(pending_numbers, None)
+            if number is not None:
+                in_flight[self.batch_executor.submit(task, number)] = number
+
+        for _ in range(max(1, max_parallel)):
+            submit_next()
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                number = in_flight.pop(future)
+                submit_next()
+                try:
+                    yield number, future.result(), None
+                except Exception as e:
+                    self.logger.error(f"Batch lookup failed for {number}: {str(e)}")
+                    yield number, None, str(e)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+        self.batch_executor.shutdown(wait=False)
@@ -0,0 +1,134 @@
+# src/services/lookup_job_service.py
+from datetime import datetime, timedelta
+import logging
+from typing import Dict, Any, Tuple, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class LookupJobService:
+    """Mongo-backed queue of asynchronous vehicle lookups with claim/lease semantics"""
+
+    def __init__(self, db, lease_seconds: int = 60, result_ttl: int = 86400, max_attempts: int = 3):
+        self.jobs_collection = db.lookup_jobs
+        self.lease_seconds = lease_seconds
+        self.result_ttl = result_ttl
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, veh_num: str, user_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Queue a lookup and return the job summary"""
+        try:
+            now = datetime.utcnow()
+            job = {
+                'veh_num': veh_num,
+                'user_id': user_id,
+                'status': QUEUED,
+                'attempts': 0,
+                'created_at': now,
+                'updated_at': now,
+                'lease_until': None,
+                'worker_id': None,
+                'result': None,
+                'error': None,
+                'expires_at': now + timedelta(seconds=self.result_ttl)
+            }
+            result = self.jobs_collection.insert_one(job)
+            return {
+                'job_id': str(result.inserted_id),
+                'veh_num': veh_num,
+                'status': QUEUED,
+                'created_at': now.isoformat()
+            }, None
+        except Exception as e:
+            self.logger.error(f"Error submitting lookup job: {str(e)}")
+            return None, str(e)
+
+    def get_job(self, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a job owned by user_id"""
+        if not ObjectId.is_valid(job_id):
+            return None
+        job = self.jobs_collection.find_one(
+            {'_id': ObjectId(job_id), 'user_id': user_id},
+            {'veh_num': 1, 'status': 1, 'attempts': 1, 'created_at': 1, 'updated_at': 1, 'result': 1, 'error': 1}
+        )
+        if not job:
+            return None
+
+        job['job_id'] = str(job.pop('_id'))
+        job['created_at'] = job['created_at'].isoformat()
+        job['updated_at'] = job['updated_at'].isoformat()
+        return job
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Lease the oldest runnable job: queued, or running with an expired lease"""
+        now = datetime.utcnow()
+        return self.jobs_collection.find_one_and_update(
+            {
+                '$or': [
+                    {'status': QUEUED},
+                    {'status': RUNNING, 'lease_until': {'$lt': now}}
+                ],
+                'attempts': {'$lt': self.max_attempts}
+            },
+            {
+                '$set': {
+                    'status': RUNNING,
+                    'worker_id': worker_id,
+                    'lease_until': now + timedelta(seconds=self.lease_seconds),
+                    'updated_at': now
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('created_at', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def complete(self, job_id: ObjectId, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Store the result; ignored if the lease was lost to another worker"""
+        update = self.jobs_collection.update_one(
+            {'_id': job_id, 'worker_id': worker_id, 'status': RUNNING},
+            {'$set': {
+                'status': DONE,
+                'result': result,
+                'error': None,
+                'lease_until': None,
+                'updated_at': datetime.utcnow()
+            }}
+        )
+        return update.modified_count > 0
+
+    def fail(self, job_id: ObjectId, worker_id: str, attempts: int, error: str) -> bool:
+        """Requeue the job, or mark it failed once max_attempts is reached"""
+        update = self.jobs_collection.update_one(
+            {'_id': job_id, 'worker_id': worker_id, 'status': RUNNING},
+            {'$set': {
+                'status': FAILED if attempts >= self.max_attempts else QUEUED,
+                'error': error,
+                'lease_until': None,
+                'updated_at': datetime.utcnow()
+            }}
+        )
+        return update.modified_count > 0
+
+    def fail_abandoned(self) -> int:
+        """Mark jobs failed whose last lease expired with no attempts left"""
+        update = self.jobs_collection.update_many(
+            {
+                'status': RUNNING,
+                'lease_until': {'$lt': datetime.utcnow()},
+                'attempts': {'$gte': self.max_attempts}
+            },
+            {'$set': {
+                'status': FAILED,
+                'error': 'Lease expired',
+                'lease_until': None,
+                'updated_at': datetime.utcnow()
+            }}
+        )
+        return update.modified_count
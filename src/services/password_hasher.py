@@ -0,0 +1,73 @@
+# src/services/password_hasher.py
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+def _hash_password(password: str, method: str) -> str:
+    return generate_password_hash(password, method=method)
+
+
+def _verify_password(password_hash: str, password: str) -> bool:
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """Runs werkzeug's password KDFs in a bounded process pool.
+
+    Hashing holds the GIL for the whole KDF, so doing it in request threads
+    stalls every other request in the worker. The *_async methods return
+    futures; hash/verify block only the calling thread.
+    """
+
+    def __init__(self, workers: int = 2, method: str = 'scrypt', timeout: float = 10):
+        self.workers = workers
+        self.method = method
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pid = None
+        self._method_prefix = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # A pool inherited across fork is unusable, so build one per process.
+        # Spawned children avoid forking a process that is running threads.
+        if self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor_pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def hash_async(self, password: str) -> Future:
+        return self._pool().submit(_hash_password, password, self.method)
+
+    def verify_async(self, password_hash: str, password: str) -> Future:
+        return self._pool().submit(_verify_password, password_hash, password)
+
+    def hash(self, password: str) -> str:
+        return self.hash_async(password).result(timeout=self.timeout)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        if not password_hash:
+            return False
+        return self.verify_async(password_hash, password).result(timeout=self.timeout)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True when the stored hash was made with different method or parameters"""
+        if self._method_prefix is None:
+            # e.g. "scrypt:32768:8:1" - werkzeug fills in the current default parameters
+            self._method_prefix = self.hash('probe').split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+    def shutdown(self):
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=False)
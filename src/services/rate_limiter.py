@@ -0,0 +1,146 @@
+# src/services/rate_limiter.py
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Tuple, Optional
+from pymongo import UpdateOne
+from .api_key_service import PLAN_RATE_LIMITS, daily_limit
+from ..utils.concurrency import ProcessThread
+
+
+class _KeyState:
+    def __init__(self, plan: str, daily_limit: int, daily_used: int, last_daily_reset: Optional[datetime]):
+        limit = PLAN_RATE_LIMITS.get(plan, PLAN_RATE_LIMITS['free'])
+        self.plan = plan
+        self.capacity = float(limit['requests'])
+        self.refill_per_second = limit['requests'] / limit['window']
+        self.tokens = self.capacity
+        self.refilled_at = time.monotonic()
+        self.daily_limit = daily_limit
+        self.daily_used = daily_used
+        self.last_daily_reset = last_daily_reset or datetime.utcnow()
+        self.synced_at = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.refilled_at) * self.refill_per_second)
+        self.refilled_at = now
+
+
+class _Pending:
+    def __init__(self):
+        self.count = 0
+        self.last_used = None
+        self.reset_at = None
+
+
+class LocalRateLimiter:
+    """Per-key token buckets and daily counters held in process memory.
+
+    Consumed requests are written behind to Mongo with one unordered
+    bulk_write every `flush_interval` seconds. Daily usage is re-seeded from
+    the key document every `resync_interval` seconds so workers converge.
+    """
+
+    def __init__(self, api_keys_collection, flush_interval: float = 0.25, resync_interval: float = 5):
+        self.collection = api_keys_collection
+        self.flush_interval = flush_interval
+        self.resync_interval = resync_interval
+        self._keys: Dict[Any, _KeyState] = {}
+        self._pending: Dict[Any, _Pending] = {}
+        self._lock = threading.Lock()
+        self._flusher = ProcessThread(self._flush_loop, 'rate-limit-flusher', on_start=self._reset_state)
+        self.logger = logging.getLogger(__name__)
+        atexit.register(self.flush)
+
+    def _state_for(self, key_data: Dict[str, Any], now: float) -> _KeyState:
+        key_id = key_data['_id']
+        plan = key_data.get('plan', 'free')
+        limit = daily_limit(key_data)
+        state = self._keys.get(key_id)
+        if state is None or state.plan != plan or state.daily_limit != limit:
+            state = self._keys[key_id] = _KeyState(
+                plan, limit, key_data.get('daily_usage', 0), key_data.get('last_daily_reset')
+            )
+        elif now - state.synced_at >= self.resync_interval:
+            # Pick up usage other workers have flushed; never move backwards
+            pending = self._pending.get(key_id)
+            stored = key_data.get('daily_usage', 0) + (pending.count if pending else 0)
+            state.daily_used = max(state.daily_used, stored)
+            state.synced_at = now
+        return state
+
+    def acquire(self, key_data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """Take one request from the key's bucket and daily allowance"""
+        self._flusher.ensure_started()
+        now = time.monotonic()
+        current_time = datetime.utcnow()
+
+        with self._lock:
+            state = self._state_for(key_data, now)
+            pending = self._pending.setdefault(key_data['_id'], _Pending())
+
+            if (current_time - state.last_daily_reset).days >= 1:
+                state.daily_used = 0
+                state.last_daily_reset = current_time
+                pending.count = 0
+                pending.reset_at = current_time
+
+            if state.daily_used >= state.daily_limit:
+                wait_hours = 24 - (current_time - state.last_daily_reset).total_seconds() / 3600
+                return False, f"Daily limit exceeded. Resets in {int(wait_hours)} hours"
+
+            state.refill(now)
+            if state.tokens < 1:
+                wait_time = (1 - state.tokens) / state.refill_per_second
+                limit = PLAN_RATE_LIMITS.get(state.plan, PLAN_RATE_LIMITS['free'])
+                return False, (
+                    f"Rate limit exceeded. "
+                    f"Limit is {limit['requests']} requests per "
+                    f"{limit['window']} seconds. "
+                    f"Please wait {max(int(wait_time), 1)} seconds."
+                )
+
+            state.tokens -= 1
+            state.daily_used += 1
+            pending.count += 1
+            pending.last_used = current_time
+            return True, None
+
+    def flush(self):
+        """Write consumed counts behind to Mongo in a single bulk_write"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+
+        operations = []
+        for key_id, pending in batch.items():
+            if pending.reset_at:
+                update = {'$set': {
+                    'daily_usage': pending.count,
+                    'last_daily_reset': pending.reset_at,
+                    'last_used': pending.last_used or pending.reset_at
+                }}
+            elif pending.count:
+                update = {'$inc': {'daily_usage': pending.count}, '$set': {'last_used': pending.last_used}}
+            else:
+                continue
+            operations.append(UpdateOne({'_id': key_id}, update))
+
+        if not operations:
+            return
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            self.logger.error(f"Error flushing rate limit counters: {str(e)}")
+
+    def _reset_state(self):
+        # Buckets and pending writes inherited across a fork belong to the parent
+        with self._lock:
+            self._keys = {}
+            self._pending = {}
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
@@ -0,0 +1,287 @@
+# src/services/resilience.py
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Callable, Optional
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+RETRYABLE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Opens when the error rate or the slow-call rate over a sliding window
+    crosses its threshold; after open_seconds one probe call is let through."""
+
+    def __init__(self, window: int = 100, min_calls: int = 20, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 5.0, slow_call_rate: float = 0.8, open_seconds: float = 30):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._calls = deque(maxlen=window)  # (ok, latency)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record(self, ok: bool, latency: float):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok and latency < self.slow_call_seconds:
+                    self.state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._open()
+                return
+
+            self._calls.append((ok, latency))
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for call_ok, _ in self._calls if not call_ok)
+            slow = sum(1 for _, call_latency in self._calls if call_latency >= self.slow_call_seconds)
+            if failures / len(self._calls) >= self.failure_rate or slow / len(self._calls) >= self.slow_call_rate:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.times_opened += 1
+        self._calls.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._calls)
+            failures = sum(1 for ok, _ in self._calls if not ok)
+            return {
+                'state': self.state,
+                'calls_in_window': calls,
+                'failure_rate': round(failures / calls, 3) if calls else 0.0,
+                'times_opened': self.times_opened,
+                'opened_at': self.opened_at or None
+            }
+
+
+class RetryBudget:
+    """Allows retries up to `ratio` of the requests seen in the last `window` seconds,
+    plus a small floor so low-traffic providers can still retry."""
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_window: int = 10, window: float = 10):
+        self.ratio = ratio
+        self.min_retries = min_retries_per_window
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self):
+        with self._lock:
+            now = time.time()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.time()
+            self._trim(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+                return False
+            self._retries.append(now)
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.time())
+            return {'requests_in_window': len(self._requests), 'retries_in_window': len(self._retries)}
+
+
+class LatencyTracker:
+    """Recent successful call latencies, used to pick the hedge delay"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+    def count(self) -> int:
+        return len(self._samples)
+
+
+class ProviderGuard:
+    """Circuit breaker, budgeted retries and optional hedging for one upstream provider"""
+
+    def __init__(self, name: str, breaker: CircuitBreaker, budget: RetryBudget, max_retries: int = 2,
+                 backoff_base: float = 0.1, backoff_cap: float = 2.0, hedge: bool = False,
+                 hedge_min_delay: float = 0.05, hedge_min_samples: int = 20,
+                 hedge_executor: Optional[ThreadPoolExecutor] = None):
+        self.name = name
+        self.breaker = breaker
+        self.budget = budget
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_executor = hedge_executor
+        self.latency = LatencyTracker()
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _is_failure(response: requests.Response) -> bool:
+        return response.status_code >= 500 or response.status_code == 429
+
+    def _backoff(self, attempt: int) -> float:
+        # Capped exponential backoff with full jitter
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or self.hedge_executor is None or self.latency.count() < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(0.95))
+
+    def _attempt(self, fn: Callable[[], requests.Response], idempotent: bool) -> requests.Response:
+        delay = self._hedge_delay() if idempotent else None
+        if delay is None:
+            return fn()
+
+        primary = self.hedge_executor.submit(fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.breaker.allow():
+            return primary.result()
+
+        self.hedges_sent += 1
+        hedge = self.hedge_executor.submit(fn)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    self.hedges_won += 1
+                return response
+        raise error
+
+    def call(self, fn: Callable[[], requests.Response], idempotent: bool = True) -> requests.Response:
+        """Run fn under the breaker, retrying idempotent calls within the retry budget"""
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open for upstream provider '{self.name}'")
+
+            started = time.perf_counter()
+            try:
+                response = self._attempt(fn, idempotent)
+            except Exception as e:
+                # Every failed attempt counts, and releases the half-open probe
+                self.breaker.record(False, time.perf_counter() - started)
+                if (not isinstance(e, RETRYABLE_ERRORS) or not idempotent
+                        or attempt >= self.max_retries or not self.budget.try_acquire()):
+                    raise
+            else:
+                latency = time.perf_counter() - started
+                failed = self._is_failure(response)
+                self.breaker.record(not failed, latency)
+                if not failed:
+                    self.latency.add(latency)
+                    return response
+                if not idempotent or attempt >= self.max_retries or not self.budget.try_acquire():
+                    return response
+
+            attempt += 1
+            self.logger.warning(f"Retrying {self.name} request (attempt {attempt + 1})")
+            time.sleep(self._backoff(attempt))
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.latency.percentile(0.95)
+        return {
+            'provider': self.name,
+            'breaker': self.breaker.snapshot(),
+            'retry_budget': self.budget.snapshot(),
+            'latency_p95_ms': round(p95 * 1000, 2) if p95 is not None else None,
+            'hedging': {
+                'enabled': self.hedge,
+                'sent': self.hedges_sent,
+                'won': self.hedges_won
+            }
+        }
+
+
+# Upstream hosts and the provider name their guard is reported under
+PROVIDER_HOSTS = {
+    'www.carinfo.app': 'carinfo',
+    'www.acko.com': 'acko'
+}
+
+
+def build_provider_guards(config) -> Dict[str, ProviderGuard]:
+    """One ProviderGuard per upstream host, configured from the app config"""
+    hedge_executor = ThreadPoolExecutor(
+        max_workers=config['UPSTREAM_HEDGE_WORKERS'],
+        thread_name_prefix='upstream-hedge'
+    ) if config['UPSTREAM_HEDGE'] else None
+
+    return {
+        host: ProviderGuard(
+            name,
+            CircuitBreaker(
+                failure_rate=config['UPSTREAM_BREAKER_FAILURE_RATE'],
+                slow_call_seconds=config['UPSTREAM_BREAKER_SLOW_CALL_SECONDS'],
+                open_seconds=config['UPSTREAM_BREAKER_OPEN_SECONDS']
+            ),
+            RetryBudget(ratio=config['UPSTREAM_RETRY_BUDGET_RATIO']),
+            max_retries=config['UPSTREAM_MAX_RETRIES'],
+            hedge=config['UPSTREAM_HEDGE'],
+            hedge_executor=hedge_executor
+        )
+        for host, name in PROVIDER_HOSTS.items()
+    }
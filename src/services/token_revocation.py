@@ -0,0 +1,87 @@
+# src/services/token_revocation.py
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Tuple
+from ..utils.concurrency import ProcessThread
+
+
+class RevocationFilter:
+    """In-memory map of users whose tokens may no longer be trusted.
+
+    A user is listed for one token lifetime after their tokens were revoked
+    (token epoch bumped, possibly with deactivation); older tokens have expired
+    by then. The map is rebuilt from Mongo every refresh_interval seconds.
+    """
+
+    def __init__(self, users_collection, refresh_interval: float = 10, token_lifetime: float = 86400):
+        self.users_collection = users_collection
+        self.refresh_interval = refresh_interval
+        self.token_lifetime = token_lifetime
+        self._revoked: Dict[str, Dict[str, Any]] = {}
+        # Revocations made in this process, with when they were recorded
+        self._recorded: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._lock = threading.Lock()
+        self._refresher = ProcessThread(self._refresh_loop, 'revocation-refresher', on_start=self._initial_load)
+        self.loaded = False
+        self.logger = logging.getLogger(__name__)
+
+    def refresh(self):
+        """Rebuild the map from users whose tokens were revoked within one token lifetime"""
+        started = time.monotonic()
+        revoked = {}
+        cursor = self.users_collection.find(
+            {'tokens_revoked_at': {'$gte': datetime.utcnow() - timedelta(seconds=self.token_lifetime)}},
+            {'is_active': 1, 'token_epoch': 1}
+        )
+        for user in cursor:
+            revoked[str(user['_id'])] = {
+                'is_active': user.get('is_active', True),
+                'token_epoch': user.get('token_epoch', 0)
+            }
+
+        with self._lock:
+            # Local revocations recorded while the query ran may be missing from it
+            self._recorded = {
+                user_id: (entry, recorded_at)
+                for user_id, (entry, recorded_at) in self._recorded.items() if recorded_at >= started
+            }
+            for user_id, (entry, _) in self._recorded.items():
+                current = revoked.get(user_id)
+                if current is None or current['token_epoch'] <= entry['token_epoch']:
+                    revoked[user_id] = entry
+            self._revoked = revoked
+        self.loaded = True
+
+    def record(self, user_id: str, token_epoch: int, is_active: bool):
+        """Apply a revocation made in this process without waiting for the next refresh"""
+        entry = {'is_active': is_active, 'token_epoch': token_epoch}
+        with self._lock:
+            self._revoked[str(user_id)] = entry
+            self._recorded[str(user_id)] = (entry, time.monotonic())
+
+    def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        entry = self._revoked.get(payload['user_id'])
+        if entry is None:
+            return False
+        return not entry['is_active'] or payload.get('tep', 0) < entry['token_epoch']
+
+    def ensure_loaded(self) -> bool:
+        """Load the map and start its refresher in this process; False if it could not load"""
+        self._refresher.ensure_started()
+        return self.loaded
+
+    def _initial_load(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            self.logger.error(f"Error loading token revocations: {str(e)}")
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Error refreshing token revocations: {str(e)}")
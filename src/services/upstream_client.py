@@ -0,0 +1,110 @@
+# src/services/upstream_client.py
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from src.services.resilience import CircuitOpenError, PROVIDER_HOSTS, ProviderGuard
+from src.utils.metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode br responses)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class UpstreamClient:
+    """Shared HTTP client for upstream providers.
+
+    Keeps one keep-alive session (and connection pool) per host and applies
+    connect/read timeouts and compression to every request. Hosts with a
+    ProviderGuard get circuit breaking, budgeted retries and hedging.
+    """
+
+    def __init__(self, pool_maxsize: int = 32, connect_timeout: float = 3.05, read_timeout: float = 10,
+                 guards: Optional[Dict[str, ProviderGuard]] = None):
+        self.pool_maxsize = pool_maxsize
+        self.timeout = (connect_timeout, read_timeout)
+        self.guards = guards or {}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        # Pooled sockets must not be shared with forked workers
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, pool_block=False)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._sessions[host] = self._new_session()
+        return session
+
+    def request(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        provider = PROVIDER_HOSTS.get(host, host)
+        started = time.perf_counter()
+        try:
+            response = self._send(method, url, host, idempotent, **kwargs)
+        except CircuitOpenError:
+            UPSTREAM_ERRORS.labels(provider, 'circuit_open').inc()
+            raise
+        except requests.Timeout:
+            UPSTREAM_ERRORS.labels(provider, 'timeout').inc()
+            raise
+        except requests.RequestException:
+            UPSTREAM_ERRORS.labels(provider, 'connection').inc()
+            raise
+        finally:
+            UPSTREAM_LATENCY.labels(provider, method.upper()).observe(time.perf_counter() - started)
+        if response.status_code >= 500:
+            UPSTREAM_ERRORS.labels(provider, 'http_5xx').inc()
+        elif response.status_code == 429:
+            UPSTREAM_ERRORS.labels(provider, 'http_429').inc()
+        return response
+
+    def _send(self, method: str, url: str, host: str, idempotent: Optional[bool], **kwargs) -> requests.Response:
+        session = self.session_for(url)
+        guard = self.guards.get(host)
+        if guard is None:
+            return session.request(method, url, **kwargs)
+
+        if idempotent is None:
+            idempotent = method.upper() in ('GET', 'HEAD', 'OPTIONS')
+        return guard.call(lambda: session.request(method, url, **kwargs), idempotent=idempotent)
+
+    def provider_status(self) -> List[Dict[str, Any]]:
+        return [guard.snapshot() for guard in self.guards.values()]
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
@@ -2,16 +2,33 @@
 # src/services/user_service.py
 from typing import Dict, Any, Tuple, Optional, List
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import logging
 from datetime import datetime
 from ..models.user_model import User, UserProfile
+from ..utils.db_errors import duplicate_key_field
+from ..utils.pagination import decode_cursor, keyset_filter, split_page
+
+# Sort key for the admin user list, served by an index declared in src/config/schema.py
+USER_LIST_SORT = ('created_at', '_id')
+# created_at is stored as an ISO string on users
+USER_LIST_CURSOR_TYPES = (str, ObjectId)
+USER_LIST_EXCLUDED_FIELDS = {'password_hash': 0, 'profile': 0}
 
 class UserService:
-    def __init__(self, db):
+    def __init__(self, db, password_hasher, auth_context_cache=None, revocation_filter=None):
         self.db = db
         self.users_collection = db.users
+        self.password_hasher = password_hasher
+        self.auth_context_cache = auth_context_cache
+        self.revocation_filter = revocation_filter
         self.logger = logging.getLogger(__name__)
 
+    def _invalidate_auth_context(self, user_id: str):
+        if self.auth_context_cache is not None:
+            self.auth_context_cache.invalidate_user(user_id)
+
     def create_user(self, user_data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         try:
             # Create user instance
@@ -21,16 +38,20 @@ class UserService:
                 role=user_data['role'],
                 username=user_data['username'],
                 email=user_data['email'],
-                password=user_data['password']
-
+                password_hash=self.password_hasher.hash(user_data['password'])
             )
 
             # Convert to dictionary for storage
             user_dict = user.to_dict()
             user_dict['password_hash'] = user.password_hash
 
-            # Insert into database
-            result = self.users_collection.insert_one(user_dict)
+            # Insert into database; the unique indexes reject existing users
+            try:
+                result = self.users_collection.insert_one(user_dict)
+            except DuplicateKeyError as e:
+                if duplicate_key_field(e) == 'email':
+                    return None, "Email already exists"
+                return None, "Username already exists"
             user_dict['_id'] = str(result.inserted_id)
             del user_dict['password_hash']
 
@@ -68,6 +89,7 @@ class UserService:
                 {'_id': ObjectId(user_id)},
                 {'$set': update_data}
             )
+            self._invalidate_auth_context(user_id)
 
             if result.modified_count:
                 updated_user = self.get_user_by_id(user_id)
@@ -84,6 +106,7 @@ class UserService:
                 {'_id': ObjectId(user_id)},
                 {'$set': {'profile.avatar_url': avatar_url}}
             )
+            self._invalidate_auth_context(user_id)
             return result.modified_count > 0, None
         except Exception as e:
             self.logger.error(f"Error updating avatar: {str(e)}")
@@ -96,29 +119,51 @@ class UserService:
                 return False, "User not found"
 
             # Verify current password
-            temp_user = User(
-                user['first_name'],
-                user['last_name'],
-                user['username'],
-                user['email']
-            )
-            temp_user.password_hash = user['password_hash']
-
-            if not temp_user.check_password(current_password):
+            if not self.password_hasher.verify(user.get('password_hash'), current_password):
                 return False, "Current password is incorrect"
 
             # Update to new password
-            new_user = User('', '', '', '', new_password)
             result = self.users_collection.update_one(
                 {'_id': ObjectId(user_id)},
-                {'$set': {'password_hash': new_user.password_hash}}
+                {'$set': {'password_hash': self.password_hasher.hash(new_password)}}
             )
+            self._invalidate_auth_context(user_id)
 
             return result.modified_count > 0, None
         except Exception as e:
             self.logger.error(f"Error updating password: {str(e)}")
             return False, str(e)
 
+    def revoke_tokens(self, user_id: str, is_active: Optional[bool] = None) -> Tuple[bool, Optional[str]]:
+        """Invalidate every token issued so far by bumping the user's token epoch,
+        optionally changing the active flag in the same update"""
+        try:
+            # tokens_revoked_at keeps the user in revocation filters for one token lifetime
+            update = {'$inc': {'token_epoch': 1}, '$set': {'tokens_revoked_at': datetime.utcnow()}}
+            if is_active is not None:
+                update['$set']['is_active'] = is_active
+
+            user = self.users_collection.find_one_and_update(
+                {'_id': ObjectId(user_id)},
+                update,
+                projection={'token_epoch': 1, 'is_active': 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if not user:
+                return False, "User not found"
+
+            self._invalidate_auth_context(user_id)
+            if self.revocation_filter is not None:
+                self.revocation_filter.record(user_id, user['token_epoch'], user.get('is_active', True))
+            return True, None
+        except Exception as e:
+            self.logger.error(f"Error revoking tokens: {str(e)}")
+            return False, str(e)
+
+    def set_active(self, user_id: str, is_active: bool) -> Tuple[bool, Optional[str]]:
+        """Activate or deactivate a user; existing tokens stop working either way"""
+        return self.revoke_tokens(user_id, is_active=is_active)
+
     def update_last_login(self, user_id: str) -> bool:
         try:
             result = self.users_collection.update_one(
@@ -131,31 +176,32 @@ class UserService:
             return False
 
 
-    def get_all_users_paginated(self, page: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+    def get_all_users_paginated(self, limit: int, cursor: Optional[str] = None,
+                                exact_count: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        """One page of users, newest first, continuing after `cursor`.
+
+        Returns (users, next_cursor, total). The total is the collection's
+        estimated document count unless exact_count is set. Raises ValueError
+        for a malformed cursor.
+        """
+        query = keyset_filter(USER_LIST_SORT, decode_cursor(cursor, USER_LIST_CURSOR_TYPES)) if cursor else {}
         try:
-            # Calculate skip value for pagination
-            skip = (page - 1) * limit
-
-            # Get total count first
-            total_count = self.users_collection.count_documents({})
-
-            # Get paginated users
-            users_cursor = self.users_collection.find({}) \
-                .skip(skip) \
-                .limit(limit) \
-                .sort('created_at', -1)  # Sort by creation date, newest first
-
-            # Convert cursor to list and process users
-            users = []
-            for user in users_cursor:
-                # Remove sensitive data and convert ObjectId
+            docs = list(
+                self.users_collection.find(query, USER_LIST_EXCLUDED_FIELDS)
+                .sort([('created_at', -1), ('_id', -1)])
+                .limit(limit + 1)
+            )
+            users, next_cursor = split_page(docs, USER_LIST_SORT, limit)
+            for user in users:
                 user['_id'] = str(user['_id'])
-                if 'password_hash' in user:
-                    del user['password_hash']
-                users.append(user)
 
-            return users, total_count
+            if exact_count:
+                total_count = self.users_collection.count_documents({})
+            else:
+                total_count = self.users_collection.estimated_document_count()
+
+            return users, next_cursor, total_count
 
         except Exception as e:
             self.logger.error(f"Error fetching paginated users: {str(e)}")
-            return [], 0
\ No newline at end of file
+            return [], None, 0
\ No newline at end of file
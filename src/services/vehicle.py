@@ -1,21 +1,118 @@
 # Desc: Service to get vehicle details from vehicle number
-from src.services.vehicledata import get_vehicle_details, getChallan
-def get_vehicle_details_from_number(vehNum):
-    number = vehNum.upper()
-    header_element, challans = getChallan(number)
-    data = ""
-    onwer_name = ""
-    # Prepare the response data
-
-    if get_vehicle_details(vehNum) != "no":
-        vdata = get_vehicle_details(vehNum)
-        onwer_name = vdata['user']['name']
-        data = vdata['vehicle']
-    response_data = {
-        'vehNum': number,
-        'onwer_name': onwer_name,
-        'header_element': header_element,
-        'challans': challans,
-        'vehicleDetails': data
-    }
-    return response_data
\ No newline at end of file
+import re
+from flask import current_app, g
+from src.services.lookup_engine import FIELD_LEGS
+from src.services.vehicle_cache import FRESH, STALE, MISS
+from src.utils.metrics import VEHICLE_CACHE_LOOKUPS
+from src.utils.request_timing import request_phase
+
+
+def fetch_vehicle_details(number, legs):
+    """Fetch from the upstream providers; returns (response_data, cacheable)"""
+    lookup = current_app.lookup_engine.lookup(number, legs)
+    g.lookup_timings = lookup.timings
+
+    if legs and not any(lookup.ok(leg) for leg in legs):
+        raise RuntimeError(f"Upstream lookup failed: {lookup.errors}")
+
+    response_data = {'vehNum': number}
+    cacheable = not lookup.errors
+
+    if 'challan' in legs:
+        header_element, challans = None, []
+        if lookup.ok('challan') and lookup.results['challan']:
+            header_element, challans = lookup.results['challan']
+        response_data['header_element'] = header_element
+        response_data['challans'] = challans
+        cacheable = cacheable and header_element is not None
+
+    if 'vehicle' in legs:
+        data = ""
+        onwer_name = ""
+        vdata = lookup.results.get('vehicle', "no")
+        if vdata != "no" and vdata is not None:
+            onwer_name = vdata['user']['name']
+            data = vdata['vehicle']
+        response_data['onwer_name'] = onwer_name
+        response_data['vehicleDetails'] = data
+        cacheable = cacheable and vdata != "no"
+
+    # Only cache lookups where every planned leg answered
+    return response_data, cacheable
+
+
+def normalize_plate(vehNum):
+    return re.sub(r'[^A-Z0-9]', '', vehNum.upper())
+
+
+def parse_fields(raw):
+    """Accept a list or comma-separated string of response fields; None means all"""
+    if raw is None:
+        return None
+    fields = raw.split(',') if isinstance(raw, str) else raw
+    if not isinstance(fields, list):
+        raise ValueError('fields must be a list or a comma-separated string')
+    fields = [str(field).strip() for field in fields if str(field).strip()]
+    unknown = [field for field in fields if field not in FIELD_LEGS]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}. Valid fields are: {", ".join(FIELD_LEGS)}')
+    return fields or None
+
+
+def _cache_key(number, legs):
+    # Full lookups are keyed by plate alone; partial ones also by their legs
+    if set(legs) == set(current_app.lookup_engine.legs):
+        return number
+    return f"{number}|{'+'.join(sorted(legs))}"
+
+
+def _load_and_cache(number, legs):
+    response_data, cacheable = fetch_vehicle_details(number, legs)
+    if cacheable:
+        current_app.vehicle_cache.set(_cache_key(number, legs), response_data)
+    return response_data, cacheable
+
+
+def load_vehicle_details(number, legs):
+    """Upstream fetch shared by every concurrent caller for the same plate and legs"""
+    (response_data, cacheable), shared = current_app.lookup_flight.do(
+        _cache_key(number, legs), _load_and_cache, number, legs
+    )
+    g.lookup_coalesced = shared
+    return response_data, cacheable
+
+
+def _project(response_data, fields):
+    if fields is None:
+        return response_data
+    return {key: value for key, value in response_data.items() if key == 'vehNum' or key in fields}
+
+
+def get_vehicle_details_from_number(vehNum, fields=None):
+    number = normalize_plate(vehNum)
+    legs = current_app.lookup_engine.plan_legs(fields)
+    if not legs:
+        # Nothing upstream is needed (e.g. fields=["vehNum"]), so nothing to cache
+        return {'vehNum': number}
+    cache = current_app.vehicle_cache
+
+    # A full entry answers any projection; fall back to an entry for exactly these legs
+    keys = [number] if _cache_key(number, legs) == number else [number, _cache_key(number, legs)]
+    cached, state = None, MISS
+    with request_phase('cache'):
+        for key in keys:
+            cached, state = cache.get(key)
+            if state != MISS:
+                break
+
+    g.lookup_cache = state
+    VEHICLE_CACHE_LOOKUPS.labels(state).inc()
+    if state == FRESH:
+        return _project(cached, fields)
+    if state == STALE:
+        refresh_legs = current_app.lookup_engine.plan_legs() if key == number else legs
+        cache.refresh_async(key, lambda _: load_vehicle_details(number, refresh_legs))
+        return _project(cached, fields)
+
+    response_data, _ = load_vehicle_details(number, legs)
+    return _project(response_data, fields)
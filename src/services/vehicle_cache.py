@@ -0,0 +1,110 @@
+# src/services/vehicle_cache.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, Optional, Tuple
+from src.utils.concurrency import app_context_task
+from src.utils.ttl_cache import TTLCache
+
+FRESH = 'fresh'
+STALE = 'stale'
+MISS = 'miss'
+
+
+class VehicleCache:
+    """Two-tier lookup cache: in-process LRU in front of a shared Mongo collection.
+
+    Entries are fresh for `ttl` seconds, then served stale for another
+    `stale_ttl` seconds while a background refresh runs.
+    """
+
+    def __init__(self, db, max_size: int = 10000, ttl: int = 3600, stale_ttl: int = 86400,
+                 refresh_workers: int = 2):
+        self.collection = db.vehicle_cache
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # (value, fetched_at), dropped once past the stale window
+        self._entries = TTLCache(max_size)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='cache-refresh')
+        self.logger = logging.getLogger(__name__)
+
+    def _state(self, age: float) -> str:
+        if age < self.ttl:
+            return FRESH
+        if age < self.ttl + self.stale_ttl:
+            return STALE
+        return MISS
+
+    def _remember(self, key: str, value: Dict[str, Any], fetched_at: float):
+        self._entries.set(key, (value, fetched_at), expires_at=fetched_at + self.ttl + self.stale_ttl)
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Return (value, state) where state is one of FRESH, STALE or MISS"""
+        now = time.time()
+        found, entry = self._entries.get(key)
+        if found:
+            state = self._state(now - entry[1])
+            if state != MISS:
+                return entry[0], state
+
+        try:
+            doc = self.collection.find_one({'_id': key})
+        except Exception as e:
+            self.logger.error(f"Error reading vehicle cache: {str(e)}")
+            return None, MISS
+        if not doc:
+            return None, MISS
+
+        age = (datetime.utcnow() - doc['fetched_at']).total_seconds()
+        state = self._state(age)
+        if state == MISS:
+            return None, MISS
+        self._remember(key, doc['value'], now - age)
+        return doc['value'], state
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a value in both tiers"""
+        now = datetime.utcnow()
+        self._remember(key, value, time.time())
+        try:
+            self.collection.replace_one(
+                {'_id': key},
+                {
+                    'value': value,
+                    'fetched_at': now,
+                    'expires_at': now + timedelta(seconds=self.ttl + self.stale_ttl)
+                },
+                upsert=True
+            )
+        except Exception as e:
+            self.logger.error(f"Error writing vehicle cache: {str(e)}")
+
+    def refresh_async(self, key: str, loader: Callable[[str], Any]):
+        """Reload a stale key in the background; loader is expected to call set()"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                loader(key)
+            except Exception as e:
+                self.logger.error(f"Background refresh failed for {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self.refresher.submit(app_context_task(refresh))
+
+    def invalidate(self, key: str):
+        self._entries.pop(key)
+        try:
+            self.collection.delete_one({'_id': key})
+        except Exception as e:
+            self.logger.error(f"Error invalidating vehicle cache: {str(e)}")
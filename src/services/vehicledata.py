@@ -1,23 +1,53 @@
+import logging
+import re
 import  requests
 from functools import wraps
 from flask import request, jsonify, current_app
+from src.services.resilience import CircuitOpenError
+from src.utils.request_timing import request_phase
 
-def getChallan(vehNum):
+logger = logging.getLogger(__name__)
+
+
+def discover_build_id():
+  """Read the live Next.js build id from the carinfo home page"""
   try:
-    url_key=current_app.api_key_service.get_url_key()
-    response = requests.get(
+    with request_phase('carinfo_build_id'):
+      response = current_app.upstream_client.get('https://www.carinfo.app/')
+    match = re.search(r'"buildId"\s*:\s*"([^"]+)"', response.text)
+    return match.group(1) if match else None
+  except requests.exceptions.RequestException as e:
+    logger.warning(f"Error discovering carinfo build id: {e}")
+    return None
 
-    f'https://www.carinfo.app/_next/data/{url_key}/challan-details/{vehNum}.json'
-    )
+
+def getChallan(vehNum):
+  try:
+    api_key_service = current_app.api_key_service
+    url_key = api_key_service.get_url_key()
+    with request_phase('carinfo_challan'):
+      response = current_app.upstream_client.get(
+      f'https://www.carinfo.app/_next/data/{url_key}/challan-details/{vehNum}.json'
+      )
+    if response.status_code == 404:
+      # Build id rotated: reload it once (coalesced) and retry
+      url_key = api_key_service.refresh_url_key(stale_key=url_key, discover=discover_build_id)
+      with request_phase('carinfo_challan'):
+        response = current_app.upstream_client.get(
+        f'https://www.carinfo.app/_next/data/{url_key}/challan-details/{vehNum}.json'
+        )
     data  = response.json()
     header_element = data['pageProps']['challanDetailsResponse']['data']['headerElement']
     challans =  data['pageProps']['challanDetailsResponse']['data']['challans']
 
     return header_element, challans
-  except requests.exceptions.RequestException as e:
-    print("Error making the request:", e)
-  except ValueError as e:
-    print("Error parsing JSON response:", e)
+  except (requests.exceptions.RequestException, CircuitOpenError) as e:
+    # Surface the failure to the lookup engine instead of hiding it
+    logger.warning(f"Error making the challan request: {e}")
+    raise RuntimeError(f"carinfo challan lookup failed: {e}") from e
+  except (ValueError, KeyError) as e:
+    logger.warning(f"Error parsing challan response: {e}")
+    raise RuntimeError(f"carinfo challan response invalid: {e}") from e
 
 
 def get_ekey(vehnum):
@@ -54,21 +84,41 @@ def get_ekey(vehnum):
     'is_new': False,
   }
 
-  response = requests.post(
-    'https://www.acko.com/motororchestrator/api/v2/proposals',
-    headers=headers,
-    json=json_data,
-  )
+  with request_phase('acko_ekey'):
+    response = current_app.upstream_client.post(
+      'https://www.acko.com/motororchestrator/api/v2/proposals',
+      headers=headers,
+      json=json_data,
+    )
   return response.json()['ekey']
 
 
+def get_proposal(ekey):
+  with request_phase('acko_proposal'):
+    response = current_app.upstream_client.get(
+      f'https://www.acko.com/motororchestrator/api/v2/proposals/{ekey}',
+    )
+  response.raise_for_status()
+  return response.json()
+
+
 def get_vehicle_details(vehnum):
   try:
-      response = requests.get(
-        f'https://www.acko.com/motororchestrator/api/v2/proposals/{get_ekey(vehnum)}',
-      )
-      return response.json()
-  except:
-    return "no"
-
+      ekey_store = current_app.ekey_store
+      ekey = ekey_store.get(vehnum)
+      if ekey:
+        # Reuse the known ekey; mint a new one only if it no longer resolves
+        try:
+          proposal = get_proposal(ekey)
+          if 'vehicle' in proposal:
+            return proposal
+        except (requests.exceptions.RequestException, ValueError) as e:
+          logger.warning(f"Cached ekey lookup failed: {e}")
+        ekey_store.discard(vehnum)
 
+      ekey = get_ekey(vehnum)
+      ekey_store.set(vehnum, ekey)
+      return get_proposal(ekey)
+  except (requests.exceptions.RequestException, CircuitOpenError, ValueError, KeyError) as e:
+    # Surface the failure to the lookup engine instead of hiding it
+    raise RuntimeError(f"Acko vehicle lookup failed: {e}") from e
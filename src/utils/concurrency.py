@@ -0,0 +1,55 @@
+# src/utils/concurrency.py
+import os
+import threading
+from functools import wraps
+from typing import Callable, Optional
+from flask import current_app, g, request, has_request_context
+
+# Request-scoped instrumentation that follows work onto worker threads
+CARRIED_G_KEYS = ('db_stats', 'db_endpoint', 'db_phase', 'request_timings')
+
+
+def app_context_task(fn: Callable) -> Callable:
+    """Wrap fn so it runs inside the current app's context on a worker thread"""
+    app = current_app._get_current_object()
+    carried = {key: g.get(key) for key in CARRIED_G_KEYS if g.get(key) is not None}
+    if has_request_context():
+        carried['db_endpoint'] = request.endpoint
+
+    @wraps(fn)
+    def run(*args, **kwargs):
+        with app.app_context():
+            for key, value in carried.items():
+                setattr(g, key, value)
+            return fn(*args, **kwargs)
+
+    return run
+
+
+class ProcessThread:
+    """A daemon thread running `target`, started at most once per process.
+
+    Threads do not survive a fork, so under gunicorn each worker starts its
+    own on first use. `on_start` runs once per process before the thread
+    starts, e.g. to drop state inherited from the parent or to do a first load.
+    """
+
+    def __init__(self, target: Callable[[], None], name: str, on_start: Optional[Callable[[], None]] = None):
+        self.target = target
+        self.name = name
+        self.on_start = on_start
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> bool:
+        """Start the thread in this process; False if it was already started"""
+        if self._pid == os.getpid():
+            return False
+        with self._lock:
+            if self._pid == os.getpid():
+                return False
+            self._pid = os.getpid()
+            if self.on_start is not None:
+                self.on_start()
+        threading.Thread(target=self.target, name=self.name, daemon=True).start()
+        return True
@@ -0,0 +1,17 @@
+# src/utils/db_errors.py
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
+
+
+def duplicate_key_field(error: DuplicateKeyError) -> Optional[str]:
+    """Name of the field whose unique index rejected the write"""
+    details = error.details or {}
+    key = details.get('keyPattern') or details.get('keyValue')
+    if key:
+        return next(iter(key))
+    # Older servers only report the index name, e.g. "email_1"
+    message = details.get('errmsg', str(error))
+    for field in ('username', 'email'):
+        if f'{field}_1' in message:
+            return field
+    return None
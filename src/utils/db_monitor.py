@@ -0,0 +1,180 @@
+# src/utils/db_monitor.py
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+from flask import g, request, has_app_context, has_request_context
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Phase for commands issued outside any db_phase() block
+HANDLER_PHASE = 'handler'
+BACKGROUND_ENDPOINT = 'background'
+
+
+class RequestDbStats:
+    """Commands and time spent in MongoDB by one request, including its worker threads"""
+
+    def __init__(self):
+        self.commands = 0
+        self.time_ms = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, duration_ms: float):
+        with self._lock:
+            self.commands += 1
+            self.time_ms += duration_ms
+
+
+@contextmanager
+def db_phase(name: str):
+    """Attribute MongoDB commands issued inside the block to `name` (e.g. a middleware)"""
+    if not has_app_context():
+        yield
+        return
+    previous = g.get('db_phase')
+    g.db_phase = name
+    try:
+        yield
+    finally:
+        g.db_phase = previous
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[int(q * (len(ordered) - 1))], 3)
+
+
+class _Series:
+    def __init__(self, samples: int):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=samples)
+
+    def add(self, value: float, failed: bool = False):
+        self.count += 1
+        self.errors += failed
+        self.total += value
+        self.samples.append(value)
+
+    def mean(self) -> float:
+        return round(self.total / self.count, 3) if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        return _percentile(list(self.samples), q)
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Attributes every MongoDB command to the Flask endpoint, phase and collection that issued it.
+
+    Commands run on the calling thread, so the request (or the context carried
+    into a worker thread by app_context_task) is known when the command starts.
+    """
+
+    def __init__(self, slow_ms: float = 100, samples: int = 1024):
+        self.slow_ms = slow_ms
+        self.samples = samples
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Counters inherited across fork describe the parent, not this worker
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple, Tuple[str, str, str, Optional[RequestDbStats]]] = {}
+        self._commands: Dict[Tuple[str, str, str], _Series] = defaultdict(lambda: _Series(self.samples))
+        self._requests: Dict[str, Dict[str, _Series]] = defaultdict(
+            lambda: {'commands': _Series(self.samples), 'time_ms': _Series(self.samples)}
+        )
+
+    def init_app(self, app):
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def _start_request():
+        g.db_stats = RequestDbStats()
+
+    def _finish_request(self, response):
+        stats = g.get('db_stats')
+        if stats is not None:
+            with self._lock:
+                series = self._requests[request.endpoint or 'unmatched']
+                series['commands'].add(stats.commands)
+                series['time_ms'].add(stats.time_ms)
+        return response
+
+    @staticmethod
+    def _context() -> Tuple[str, str, Optional[RequestDbStats]]:
+        if has_request_context():
+            return request.endpoint or 'unmatched', g.get('db_phase') or HANDLER_PHASE, g.get('db_stats')
+        if has_app_context():
+            return g.get('db_endpoint') or BACKGROUND_ENDPOINT, g.get('db_phase') or HANDLER_PHASE, g.get('db_stats')
+        return BACKGROUND_ENDPOINT, HANDLER_PHASE, None
+
+    @staticmethod
+    def _collection(event) -> str:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        # getMore names its collection separately; admin commands have none
+        return event.command.get('collection', '-')
+
+    def started(self, event):
+        endpoint, phase, stats = self._context()
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                endpoint, phase, self._collection(event), stats
+            )
+
+    def _finished(self, event, failed: bool):
+        with self._lock:
+            context = self._pending.pop((event.connection_id, event.request_id), None)
+            if context is None:
+                return
+            endpoint, phase, collection, stats = context
+            duration_ms = event.duration_micros / 1000
+            self._commands[(endpoint, phase, collection)].add(duration_ms, failed)
+        if stats is not None:
+            stats.add(duration_ms)
+        if duration_ms >= self.slow_ms:
+            logger.warning(
+                f"Slow MongoDB command: {event.command_name} on {collection} took {duration_ms:.1f} ms "
+                f"(endpoint={endpoint}, phase={phase}{', failed' if failed else ''})"
+            )
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-endpoint request totals and per (endpoint, phase, collection) command timings"""
+        with self._lock:
+            commands = [
+                {
+                    'endpoint': endpoint, 'phase': phase, 'collection': collection,
+                    'count': series.count, 'errors': series.errors, 'total_ms': round(series.total, 3),
+                    'p50_ms': series.percentile(0.5), 'p99_ms': series.percentile(0.99)
+                }
+                for (endpoint, phase, collection), series in self._commands.items()
+            ]
+            requests = {
+                endpoint: {
+                    'requests': series['commands'].count,
+                    'commands_per_request': series['commands'].mean(),
+                    'commands_per_request_p99': series['commands'].percentile(0.99),
+                    'db_ms_per_request': series['time_ms'].mean(),
+                    'db_ms_p50': series['time_ms'].percentile(0.5),
+                    'db_ms_p99': series['time_ms'].percentile(0.99)
+                }
+                for endpoint, series in self._requests.items()
+            }
+        commands.sort(key=lambda entry: entry['total_ms'], reverse=True)
+        return {'requests': requests, 'commands': commands}
@@ -0,0 +1,83 @@
+# src/utils/metrics.py
+"""Prometheus metrics for the app.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty directory before the
+app is imported: each worker then writes its samples to its own mmap'd files
+there and /metrics aggregates all of them. Without it, metrics are per process.
+"""
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency',
+    ['blueprint', 'endpoint', 'method'],
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+)
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP responses by status',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being handled',
+    multiprocess_mode='livesum'
+)
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds', 'Upstream provider call latency, including retries and hedges',
+    ['provider', 'method'],
+    buckets=(.05, .1, .25, .5, 1, 2, 5, 10, 30)
+)
+UPSTREAM_ERRORS = Counter(
+    'upstream_errors_total', 'Failed upstream provider calls',
+    ['provider', 'kind']
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    'rate_limit_rejections_total', 'Requests rejected by rate or quota limits',
+    ['plan', 'reason']
+)
+VEHICLE_CACHE_LOOKUPS = Counter(
+    'vehicle_cache_lookups_total', 'Vehicle lookup cache results',
+    ['result']
+)
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    IN_FLIGHT.inc()
+
+
+def _record_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _finish_request(error=None):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return
+    IN_FLIGHT.dec()
+    # Unmatched URLs share one label so scanners cannot blow up cardinality
+    endpoint = request.endpoint or 'unmatched'
+    blueprint = request.blueprint or '-'
+    status = g.get('metrics_status', 500) if error is None else 500
+    REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+    REQUESTS.labels(blueprint, endpoint, request.method, str(status)).inc()
+
+
+def init_app(app):
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+
+
+def render_metrics() -> Response:
+    """Exposition of every worker's metrics (multiprocess mode) or this process's"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,54 @@
+# src/utils/pagination.py
+import base64
+import binascii
+from typing import Any, Dict, List, Optional, Tuple
+from bson import json_util
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque token for the sort-key values of the last item on a page"""
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str, types: Tuple[type, ...]) -> List[Any]:
+    """Inverse of encode_cursor; raises ValueError for malformed tokens.
+
+    Each value must be an instance of the matching entry in `types`, so a
+    client-made cursor cannot smuggle query operators ({"$ne": ...}) or
+    values of another BSON type into the keyset filter.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(value, expected) for value, expected in zip(values, types)):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_filter(fields: Tuple[str, ...], values: List[Any]) -> Dict[str, Any]:
+    """Filter matching documents after `values` in a descending sort on `fields`.
+
+    For ('created_at', '_id') this builds
+    {$or: [{created_at: {$lt: v0}}, {created_at: v0, _id: {$lt: v1}}]},
+    which an index on the same fields answers without skipping.
+    """
+    if len(values) != len(fields):
+        raise ValueError("Invalid cursor")
+    clauses = []
+    for i, field in enumerate(fields):
+        clause = {fields[j]: values[j] for j in range(i)}
+        clause[field] = {'$lt': values[i]}
+        clauses.append(clause)
+    return {'$or': clauses}
+
+
+def split_page(docs: List[Dict[str, Any]], fields: Tuple[str, ...], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim a limit + 1 fetch to one page and build the cursor for the next"""
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor([docs[-1].get(field) for field in fields])
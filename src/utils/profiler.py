@@ -0,0 +1,233 @@
+# src/utils/profiler.py
+"""Production profiling without a redeploy.
+
+RequestProfiler: an admin sends `X-Profile: 1` (or `?__profile=1`) with a
+valid admin JWT and that one request runs under cProfile. The .pstats file is
+saved to PROFILE_DIR and its name returned in the X-Profile-Id header.
+cProfile only sees the request thread; upstream legs run on executor
+threads and show up there as time spent waiting on futures.
+
+SamplingProfiler: a background thread that samples every thread's stack at a
+fixed rate and periodically writes the counts in collapsed-stack format
+(`frame;frame;frame count`). Feed the files to flamegraph.pl or speedscope.
+"""
+import cProfile
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Any, List, Optional
+from flask import g, request
+from src.middlewares.auth import token_required
+from src.middlewares.role_check import admin_required
+
+PROFILE_NAME = re.compile(r'^[A-Za-z0-9_.-]+\.(pstats|collapsed)$')
+
+
+def _prune(directory: str, max_files: int):
+    files = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if PROFILE_NAME.match(name)),
+        key=os.path.getmtime
+    )
+    for path in files[:max(len(files) - max_files, 0)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def list_profiles(directory: str) -> List[Dict[str, Any]]:
+    """Saved profile artifacts, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if PROFILE_NAME.match(name):
+            stat = os.stat(os.path.join(directory, name))
+            profiles.append({'name': name, 'bytes': stat.st_size, 'modified': stat.st_mtime})
+    return sorted(profiles, key=lambda profile: profile['modified'], reverse=True)
+
+
+class RequestProfiler:
+    """Profiles single requests on demand for admins"""
+
+    HEADER = 'X-Profile'
+    QUERY_ARG = '__profile'
+
+    def __init__(self, directory: str = 'profiles', max_files: int = 200):
+        self.directory = directory
+        self.max_files = max_files
+        # cProfile allows one active profiler per process
+        self._busy = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._add_header)
+        app.teardown_request(self._stop)
+
+    def _requested(self) -> bool:
+        return request.headers.get(self.HEADER) == '1' or request.args.get(self.QUERY_ARG) == '1'
+
+    def _start(self):
+        if not self._requested():
+            return None
+
+        # Same checks as admin routes; a rejection answers the request
+        denied = token_required(admin_required(lambda current_user: None))()
+        if denied is not None:
+            return denied
+
+        if not self._busy.acquire(blocking=False):
+            g.profile_status = 'busy'
+            return None
+        g.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+        return None
+
+    @staticmethod
+    def _add_header(response):
+        if g.get('profile_id'):
+            response.headers['X-Profile-Id'] = f'{g.profile_id}.pstats'
+        elif g.get('profile_status'):
+            response.headers['X-Profile-Status'] = g.profile_status
+        return response
+
+    def _stop(self, error=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        try:
+            profiler.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.directory, f'{g.profile_id}.pstats'))
+            _prune(self.directory, self.max_files)
+        except Exception as e:
+            self.logger.error(f"Error saving request profile: {str(e)}")
+        finally:
+            self._busy.release()
+
+
+class SamplingProfiler:
+    """Samples all thread stacks at `hz` and writes collapsed stacks every `flush_interval` seconds"""
+
+    def __init__(self, directory: str = 'profiles', hz: float = 50, flush_interval: float = 60,
+                 max_files: int = 200, autostart: bool = False):
+        self.directory = directory
+        self.hz = hz
+        self.flush_interval = flush_interval
+        self.max_files = max_files
+        self.autostart = autostart
+        self._frame_names: Dict[Any, str] = {}
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.started_at = None
+        self.logger = logging.getLogger(__name__)
+
+    def init_app(self, app):
+        # Threads do not survive gunicorn's fork, so each worker starts its own sampler
+        app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if self.autostart and not self.running:
+            self.start()
+
+    @property
+    def running(self) -> bool:
+        # A sampler thread started before a fork does not exist in the child
+        return self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive()
+
+    def start(self, hz: Optional[float] = None) -> bool:
+        """Start sampling in this process; False if it is already running"""
+        with self._lock:
+            if self.running:
+                return False
+            if hz:
+                self.hz = hz
+            self._stop = threading.Event()
+            self._stacks = Counter()
+            self._samples = 0
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+            return True
+
+    def stop(self) -> Optional[str]:
+        """Stop sampling and write what was collected; returns the artifact name"""
+        with self._lock:
+            self.autostart = False
+            if not self.running:
+                return None
+            self._stop.set()
+            thread = self._thread
+        thread.join(timeout=5)
+        return self.flush()
+
+    def _frame_name(self, code) -> str:
+        name = self._frame_names.get(code)
+        if name is None:
+            path = code.co_filename.replace(os.sep, '/').rsplit('/', 2)
+            name = self._frame_names[code] = f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+        return name
+
+    def _sample(self, own_id: int, names: Dict[int, str]):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(self._frame_name(frame.f_code))
+                frame = frame.f_back
+            frames.append(names.get(thread_id, f'thread-{thread_id}'))
+            self._stacks[';'.join(reversed(frames))] += 1
+        self._samples += 1
+
+    def _run(self):
+        own_id = threading.get_ident()
+        interval = 1.0 / self.hz
+        last_flush = time.monotonic()
+        while not self._stop.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            with self._lock:
+                self._sample(own_id, names)
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self.flush()
+                last_flush = time.monotonic()
+
+    def flush(self) -> Optional[str]:
+        """Write and reset the stacks collected since the last flush"""
+        with self._lock:
+            stacks, self._stacks = self._stacks, Counter()
+        if not stacks:
+            return None
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}.collapsed"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name), 'w') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f'{stack} {count}\n')
+            _prune(self.directory, self.max_files)
+        except Exception as e:
+            self.logger.error(f"Error writing profiler samples: {str(e)}")
+            return None
+        return name
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'pid': os.getpid(),
+            'running': self.running,
+            'hz': self.hz,
+            'flush_interval': self.flush_interval,
+            'started_at': self.started_at if self.running else None,
+            'samples': self._samples if self.running else 0
+        }
@@ -0,0 +1,132 @@
+# src/utils/request_timing.py
+"""Per-request phase timings, reported as a Server-Timing header and a JSON access log line.
+
+Code marks phases with `with request_phase('name'):`; repeated phases add up.
+Phases run on worker threads count too, since app_context_task carries the
+request's timings into them. Parallel phases can therefore sum to more than
+the total.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List
+from flask import g, request, has_app_context
+from flask.json.provider import DefaultJSONProvider
+from src.utils.db_monitor import db_phase
+
+access_logger = logging.getLogger('access')
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration_ms: float):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + duration_ms
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(duration, 2) for name, duration in self.phases.items()}
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+
+@contextmanager
+def request_phase(name: str):
+    """Time the block as phase `name` of the current request; MongoDB commands in it are attributed to it too"""
+    timings = g.get('request_timings') if has_app_context() else None
+    started = time.perf_counter()
+    with db_phase(name):
+        try:
+            yield
+        finally:
+            if timings is not None:
+                timings.add(name, (time.perf_counter() - started) * 1000)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with serialization time recorded as the `serialize` phase"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        with request_phase('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+
+
+def _server_timing(phases: Dict[str, float], total_ms: float) -> str:
+    entries: List[str] = [f'{_metric_name(name)};dur={duration}' for name, duration in phases.items()]
+    for leg, duration in (g.get('lookup_timings') or {}).items():
+        entries.append(f'leg_{_metric_name(leg)};dur={duration}')
+    db_stats = g.get('db_stats')
+    if db_stats is not None and db_stats.commands:
+        entries.append(f'db;dur={round(db_stats.time_ms, 2)};desc="{db_stats.commands} commands"')
+    if g.get('lookup_cache'):
+        entries.append(f'cache_state;desc={g.lookup_cache}')
+    entries.append(f'total;dur={total_ms}')
+    return ', '.join(entries)
+
+
+class RequestTimingReporter:
+    def __init__(self, server_timing: bool = True, access_log: bool = True):
+        self.server_timing = server_timing
+        self.access_log = access_log
+
+    def init_app(self, app):
+        app.json = TimedJSONProvider(app)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def _start_request():
+        g.request_timings = RequestTimings()
+
+    def _finish_request(self, response):
+        timings = g.get('request_timings')
+        if timings is None:
+            return response
+        if self.server_timing:
+            response.headers['Server-Timing'] = _server_timing(timings.snapshot(), timings.elapsed_ms())
+        if self.access_log:
+            # Log once the body has been sent, so streamed responses are timed in full
+            entry = {
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'remote_addr': request.remote_addr
+            }
+            lookup_timings = g.get('lookup_timings') or {}
+            db_stats = g.get('db_stats')
+            cache_state = g.get('lookup_cache')
+            coalesced = g.get('lookup_coalesced')
+            response.call_on_close(
+                lambda: self._log(entry, timings, lookup_timings, db_stats, cache_state, coalesced, response)
+            )
+        return response
+
+    @staticmethod
+    def _log(entry, timings, lookup_timings, db_stats, cache_state, coalesced, response):
+        entry.update({
+            'ts': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': timings.elapsed_ms(),
+            'bytes': response.calculate_content_length(),
+            'phases': timings.snapshot(),
+            'legs': lookup_timings,
+            'db': {
+                'commands': db_stats.commands, 'ms': round(db_stats.time_ms, 2)
+            } if db_stats is not None else None,
+            'cache': cache_state,
+            'coalesced': coalesced
+        })
+        access_logger.info(json.dumps(entry, default=str))
@@ -0,0 +1,90 @@
+# src/workers/lookup_worker.py
+"""Worker pool for queued vehicle lookups.
+
+Runs inside the web process when LOOKUP_JOB_WORKERS > 0, or standalone:
+
+    python -m src.workers.lookup_worker --workers 8
+"""
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+from typing import List
+from src.services.vehicle import get_vehicle_details_from_number
+
+
+class LookupWorkerPool:
+    def __init__(self, app, workers: int = 4, poll_interval: float = 1.0):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> 'LookupWorkerPool':
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run,
+                args=(f"{self.worker_prefix}:{i}",),
+                name=f'lookup-worker-{i}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info(f"Started {self.workers} lookup job workers")
+        return self
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self, worker_id: str):
+        with self.app.app_context():
+            job_service = self.app.lookup_job_service
+            while not self._stop.is_set():
+                try:
+                    job = job_service.claim(worker_id)
+                except Exception as e:
+                    self.logger.error(f"Error claiming lookup job: {str(e)}")
+                    job = None
+
+                if not job:
+                    try:
+                        job_service.fail_abandoned()
+                    except Exception as e:
+                        self.logger.error(f"Error failing abandoned jobs: {str(e)}")
+                    self._stop.wait(self.poll_interval)
+                    continue
+
+                try:
+                    result = get_vehicle_details_from_number(job['veh_num'])
+                    job_service.complete(job['_id'], worker_id, result)
+                except Exception as e:
+                    self.logger.error(f"Lookup job {job['_id']} failed: {str(e)}")
+                    job_service.fail(job['_id'], worker_id, job['attempts'], str(e))
+
+    def run_forever(self):
+        self.start()
+        try:
+            while not self._stop.is_set():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stop()
+
+
+if __name__ == '__main__':
+    from main import create_app
+
+    parser = argparse.ArgumentParser(description='Process queued vehicle lookup jobs')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('LOOKUP_JOB_PROCESS_WORKERS', 8)))
+    parser.add_argument('--poll-interval', type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app(os.getenv('FLASK_ENV', 'dev'), start_job_workers=False)
+    LookupWorkerPool(app, workers=args.workers, poll_interval=args.poll_interval).run_forever()
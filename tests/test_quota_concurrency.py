@@ -0,0 +1,86 @@
+# tests/test_quota_concurrency.py
+"""Concurrent consume_request calls against one key on a real mongod.
+
+Set MONGO_URI to point at a test server; the tests skip when it is unreachable.
+"""
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from src.services.api_key_service import APIKeyService, PLAN_RATE_LIMITS
+
+THREADS = 16
+
+
+@pytest.fixture
+def db():
+    client = MongoClient(os.environ.get('MONGO_URI', 'mongodb://localhost:27017'),
+                         serverSelectionTimeoutMS=1000, maxPoolSize=THREADS)
+    try:
+        client.admin.command('ping')
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"MongoDB is not reachable: {e}")
+    name = f'test_quota_{uuid.uuid4().hex[:8]}'
+    yield client[name]
+    client.drop_database(name)
+    client.close()
+
+
+def _insert_key(db, daily_limit: int) -> str:
+    api_key = f'veh_{uuid.uuid4().hex}'
+    db.api_keys.insert_one({
+        'api_key': api_key, 'user_id': 'quota-test', 'name': 'quota test', 'plan': 'free',
+        'is_active': True, 'daily_limit': daily_limit, 'daily_usage': 0, 'last_reset': datetime.utcnow()
+    })
+    return api_key
+
+
+def _hammer(service: APIKeyService, api_key: str, attempts: int):
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(lambda _: service.consume_request(api_key), range(attempts)))
+    accepted = sum(1 for key_data, error, _ in results if key_data is not None and error is None)
+    limited = sum(1 for _, _, is_rate_limited in results if is_rate_limited)
+    return accepted, limited
+
+
+def test_daily_limit_is_never_exceeded(db):
+    limit = 50
+    api_key = _insert_key(db, daily_limit=limit)
+
+    accepted, limited = _hammer(APIKeyService(db), api_key, attempts=limit * 4)
+
+    doc = db.api_keys.find_one({'api_key': api_key})
+    assert accepted == limit
+    assert limited == limit * 3
+    assert doc['daily_usage'] == limit
+    assert doc['requests_count'] == limit
+    assert 'quota_allowed' not in doc
+
+
+def test_window_limit_is_never_exceeded(db):
+    window_limit = PLAN_RATE_LIMITS['free']['requests']
+    api_key = _insert_key(db, daily_limit=window_limit * 10)
+
+    accepted, limited = _hammer(APIKeyService(db), api_key, attempts=window_limit * 2)
+
+    doc = db.api_keys.find_one({'api_key': api_key})
+    assert accepted == window_limit
+    assert limited == window_limit
+    assert doc['requests_count'] == window_limit
+    assert doc['daily_usage'] == window_limit
+
+
+def test_key_daily_limit_overrides_plan_default(db):
+    api_key = _insert_key(db, daily_limit=3)
+    service = APIKeyService(db)
+
+    results = [service.consume_request(api_key) for _ in range(5)]
+
+    assert [error is None for _, error, _ in results] == [True, True, True, False, False]
+    assert results[-1][1].startswith('Daily limit exceeded')